@@ -0,0 +1,70 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+MAX_TRACKED_KEYS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def try_acquire(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+
+        return (1 - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+
+class AdmissionController:
+    def __init__(
+            self,
+            rate_per_second: float,
+            burst: float,
+            max_in_flight: int,
+            retry_after: float = 1.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1.0, burst)
+        self.retry_after = retry_after
+        self._clock = clock
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._buckets_lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def check_rate(self, client_key: str) -> Optional[int]:
+        now = self._clock()
+
+        with self._buckets_lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_second, self.burst, now)
+                self._buckets[client_key] = bucket
+                while len(self._buckets) > MAX_TRACKED_KEYS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_key)
+
+            wait = bucket.try_acquire(now)
+
+        if wait <= 0:
+            return None
+        return max(1, math.ceil(min(wait, 3600)))
+
+    def try_enter(self) -> Optional[int]:
+        if self._in_flight.acquire(blocking=False):
+            return None
+        return max(1, math.ceil(self.retry_after))
+
+    def leave(self) -> None:
+        self._in_flight.release()
@@ -0,0 +1,73 @@
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+from errors import QueryValidationError
+
+CATEGORICAL_FIELDS = {
+    'people': ('gender', 'eye_color', 'hair_color', 'skin_color'),
+    'planets': ('climate', 'terrain'),
+    'starships': ('starship_class',),
+    'vehicles': ('vehicle_class',),
+    'species': ('classification', 'designation', 'eye_colors', 'hair_colors', 'skin_colors'),
+    'films': ('director', 'producer'),
+}
+
+FILTERABLE_FIELDS = frozenset(field for fields in CATEGORICAL_FIELDS.values() for field in fields)
+
+FieldFilters = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def tokenize(value: Any) -> List[str]:
+    if not isinstance(value, str):
+        return []
+    return [token.strip().lower() for token in value.split(',') if token.strip()]
+
+
+def normalize_filters(filters: Optional[Dict[str, List[str]]]) -> FieldFilters:
+    normalized = []
+    for field, values in (filters or {}).items():
+        tokens = sorted({token for value in values for token in tokenize(value)})
+        if tokens:
+            normalized.append((field, tuple(tokens)))
+    return tuple(sorted(normalized))
+
+
+def bitmap_positions(bitmap: int) -> Iterator[int]:
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class BitmapIndex:
+    def __init__(self, data: Dict[str, List[Dict[str, Any]]]):
+        self._bitmaps: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._all: Dict[str, int] = {}
+
+        for resource_type, fields in CATEGORICAL_FIELDS.items():
+            items = data.get(resource_type, [])
+            bitmaps: Dict[str, Dict[str, int]] = {field: {} for field in fields}
+
+            for position, item in enumerate(items):
+                bit = 1 << position
+                for field in fields:
+                    field_bitmaps = bitmaps[field]
+                    for token in tokenize(item.get(field)):
+                        field_bitmaps[token] = field_bitmaps.get(token, 0) | bit
+
+            self._bitmaps[resource_type] = bitmaps
+            self._all[resource_type] = (1 << len(items)) - 1
+
+    def match(self, resource_type: str, filters: FieldFilters) -> int:
+        bitmaps = self._bitmaps.get(resource_type, {})
+        result = self._all.get(resource_type, 0)
+
+        for field, values in filters:
+            if field not in bitmaps:
+                raise QueryValidationError(f'Field "{field}" cannot be filtered for {resource_type}.')
+
+            field_bitmap = 0
+            for value in values:
+                field_bitmap |= bitmaps[field].get(value, 0)
+            result &= field_bitmap
+
+        return result
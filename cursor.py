@@ -0,0 +1,43 @@
+import base64
+import binascii
+import json
+from typing import Dict, Any
+
+from errors import QueryValidationError
+
+
+class CursorExpiredError(ValueError):
+    pass
+
+
+_CURSOR_FIELDS = {
+    'v': (str,),
+    'q': (list,),
+    'p': (int,),
+    'n': (int,),
+}
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (ValueError, binascii.Error):
+        raise QueryValidationError('Invalid cursor')
+
+    if not isinstance(state, dict) or set(state) != set(_CURSOR_FIELDS):
+        raise QueryValidationError('Invalid cursor')
+
+    for key, types in _CURSOR_FIELDS.items():
+        if type(state[key]) not in types:
+            raise QueryValidationError('Invalid cursor')
+
+    if state['p'] < 0 or state['n'] < 1:
+        raise QueryValidationError('Invalid cursor')
+
+    return state
@@ -0,0 +1,6 @@
+class QueryValidationError(ValueError):
+    pass
+
+
+class SnapshotBusyError(Exception):
+    pass
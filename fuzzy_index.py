@@ -0,0 +1,98 @@
+import heapq
+from typing import List, Dict, Any, Optional, Tuple
+
+from resources import RESOURCE_TYPES, name_field
+
+MAX_CANDIDATES = 64
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _bounded_levenshtein(a: str, b: str, limit: int) -> Optional[int]:
+    if abs(len(a) - len(b)) > limit:
+        return None
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return None
+        previous = current
+
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def max_distance(term: str) -> int:
+    return max(1, len(term) // 4)
+
+
+class FuzzyIndex:
+    def __init__(self, data: Dict[str, List[Dict[str, Any]]]):
+        self._names: Dict[str, List[str]] = {}
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+
+        for resource_type in RESOURCE_TYPES:
+            field = name_field(resource_type)
+            names = [str(item.get(field, '')).lower() for item in data.get(resource_type, [])]
+            postings: Dict[str, List[int]] = {}
+
+            for position, name in enumerate(names):
+                for trigram in _trigrams(name):
+                    postings.setdefault(trigram, []).append(position)
+
+            self._names[resource_type] = names
+            self._postings[resource_type] = postings
+
+    def _distance(self, term: str, name: str, limit: int) -> Optional[int]:
+        if term in name:
+            return 0
+
+        best = _bounded_levenshtein(term, name, limit)
+
+        words = name.split()
+        width = len(term.split())
+        for start in range(len(words) - width + 1):
+            window = ' '.join(words[start:start + width])
+            distance = _bounded_levenshtein(term, window, limit if best is None else best - 1)
+            if distance is not None:
+                best = distance
+
+        return best
+
+    def search(self, resource_type: str, term: str) -> List[int]:
+        term = ' '.join(term.lower().split())
+        names = self._names.get(resource_type, [])
+        postings = self._postings.get(resource_type, {})
+        if not term:
+            return list(range(len(names)))
+
+        if len(term) < 3:
+            # Too short to carry trigrams; typo tolerance is meaningless here anyway.
+            return [position for position, name in enumerate(names) if term in name]
+
+        shared: Dict[int, int] = {}
+        for trigram in _trigrams(term):
+            for position in postings.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        # Only the best trigram overlaps are scored, which bounds the work per query.
+        candidates = heapq.nlargest(MAX_CANDIDATES, shared.items(), key=lambda entry: (entry[1], -entry[0]))
+
+        limit = max_distance(term)
+        ranked: List[Tuple[int, int, int]] = []
+        for position, overlap in candidates:
+            distance = self._distance(term, names[position], limit)
+            if distance is not None:
+                ranked.append((distance, -overlap, position))
+
+        ranked.sort()
+        return [position for _, _, position in ranked]
@@ -1,13 +1,42 @@
+import os
+
 import functions_framework
 from dotenv import load_dotenv
 
+from admission_control import AdmissionController
+from shared_snapshot import SharedSnapshotStore, default_snapshot_path
 from starwars_controller import StarWarsController
-from starwars_service import StarWarsService
+from starwars_service import StarWarsService, DEFAULT_SNAPSHOT_TTL, DEFAULT_WARMUP_TOP_IDS
 
 load_dotenv()
 
-service = StarWarsService()
-controller = StarWarsController(service)
+snapshot_ttl = float(os.environ.get('SNAPSHOT_TTL_SECONDS', DEFAULT_SNAPSHOT_TTL))
+
+snapshot_store = None
+if os.environ.get('SHARED_SNAPSHOT', '').lower() in ('1', 'true', 'yes'):
+    snapshot_store = SharedSnapshotStore(
+        os.environ.get('SHARED_SNAPSHOT_PATH') or default_snapshot_path(),
+        ttl=snapshot_ttl
+    )
+
+service = StarWarsService(
+    snapshot_ttl=snapshot_ttl,
+    snapshot_store=snapshot_store,
+    query_backend=os.environ.get('QUERY_BACKEND', 'memory'),
+    warmup_base_url=os.environ.get('BASE_URL', '').rstrip('/') or None,
+    warmup_queries=os.environ.get('WARMUP_QUERIES', '').split() or None,
+    warmup_top_ids=int(os.environ.get('WARMUP_TOP_IDS', DEFAULT_WARMUP_TOP_IDS))
+)
+admission = AdmissionController(
+    rate_per_second=float(os.environ.get('RATE_LIMIT_PER_SECOND', 1)),
+    burst=float(os.environ.get('RATE_LIMIT_BURST', 5)),
+    max_in_flight=int(os.environ.get('MAX_IN_FLIGHT_UPSTREAM', 4))
+)
+controller = StarWarsController(
+    service,
+    admission,
+    trusted_proxies=int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+)
 
 
 @functions_framework.http
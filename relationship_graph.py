@@ -0,0 +1,85 @@
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple, FrozenSet, Iterable, Mapping
+
+from errors import QueryValidationError
+from resources import RESOURCE_TYPES, parse_resource_url
+
+RELATION_FIELDS = (
+    'characters',
+    'films',
+    'homeworld',
+    'people',
+    'pilots',
+    'planets',
+    'residents',
+    'species',
+    'starships',
+    'vehicles',
+)
+
+
+class RelationshipGraph:
+    def __init__(self, data: Mapping[str, Sequence[Dict[str, Any]]]):
+        self._data = data
+        self._node_ids: Dict[Tuple[str, int], int] = {}
+        self._nodes: List[Tuple[str, int]] = []
+        # Nodes point at (type, position) so items are only decoded when returned.
+        self._positions: List[Tuple[str, int]] = []
+
+        for resource_type in RESOURCE_TYPES:
+            for position, item in enumerate(data.get(resource_type, [])):
+                key = parse_resource_url(item.get('url'))
+                if key is None or key in self._node_ids:
+                    continue
+
+                self._node_ids[key] = len(self._nodes)
+                self._nodes.append(key)
+                self._positions.append((resource_type, position))
+
+        self._edges: List[Dict[str, FrozenSet[int]]] = [
+            self._build_edges(self.item(node)) for node in range(len(self._nodes))
+        ]
+
+    def _build_edges(self, item: Dict[str, Any]) -> Dict[str, FrozenSet[int]]:
+        edges = {}
+
+        for relation in RELATION_FIELDS:
+            value = item.get(relation)
+            urls = [value] if isinstance(value, str) else value or []
+
+            targets = set()
+            for url in urls:
+                node = self._node_ids.get(parse_resource_url(url))
+                if node is not None:
+                    targets.add(node)
+
+            if targets:
+                edges[relation] = frozenset(targets)
+
+        return edges
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node_id(self, resource_type: str, resource_id: int) -> Optional[int]:
+        return self._node_ids.get((resource_type, resource_id))
+
+    def item(self, node: int) -> Dict[str, Any]:
+        resource_type, position = self._positions[node]
+        return self._data[resource_type][position]
+
+    def traverse(self, start: Iterable[int], path: Sequence[str]) -> Set[int]:
+        frontier = set(start)
+
+        for relation in path:
+            if relation not in RELATION_FIELDS:
+                raise QueryValidationError(f'Unknown relation "{relation}"')
+
+            reached = set()
+            for node in frontier:
+                reached |= self._edges[node].get(relation, frozenset())
+            frontier = reached
+
+        return frontier
+
+    def items(self, nodes: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.item(node) for node in sorted(nodes, key=lambda node: self._nodes[node])]
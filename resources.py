@@ -0,0 +1,48 @@
+from typing import Any, Optional, Tuple
+
+RESOURCE_TYPES = ('people', 'planets', 'starships', 'films', 'species', 'vehicles')
+
+RESOURCE_ALIASES = {
+    'people': 'people',
+    'person': 'people',
+    'planets': 'planets',
+    'planet': 'planets',
+    'starships': 'starships',
+    'starship': 'starships',
+    'films': 'films',
+    'film': 'films',
+    'species': 'species',
+    'specie': 'species',
+    'vehicles': 'vehicles',
+    'vehicle': 'vehicles',
+}
+
+
+def canonical_resource_type(resource_type: Optional[str]) -> Optional[str]:
+    if not resource_type:
+        return None
+    return RESOURCE_ALIASES.get(resource_type.lower())
+
+
+def name_field(resource_type: str) -> str:
+    return 'title' if resource_type == 'films' else 'name'
+
+
+def parse_resource_url(url: Any) -> Optional[Tuple[str, int]]:
+    if not isinstance(url, str):
+        return None
+
+    parts = [p for p in url.rstrip('/').split('/') if p]
+    if len(parts) < 2:
+        return None
+
+    resource_type = canonical_resource_type(parts[-2])
+    try:
+        resource_id = int(parts[-1])
+    except ValueError:
+        return None
+
+    if resource_type is None:
+        return None
+
+    return resource_type, resource_id
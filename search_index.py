@@ -0,0 +1,103 @@
+import bisect
+from typing import List, Dict, Any, Tuple
+
+from resources import RESOURCE_TYPES, name_field, parse_resource_url
+
+_MAX_CHAR = '\U0010ffff'
+
+
+class SearchIndex:
+    def __init__(self, data: Dict[str, List[Dict[str, Any]]]):
+        self._entries: List[Dict[str, Any]] = []
+        self._names: List[str] = []
+
+        suffixes: List[Tuple[str, int, bool]] = []
+
+        for resource_type in RESOURCE_TYPES:
+            field = name_field(resource_type)
+
+            for item in data.get(resource_type, []):
+                name = item.get(field)
+                if not isinstance(name, str) or not name:
+                    continue
+
+                key = parse_resource_url(item.get('url'))
+                entry_id = len(self._entries)
+
+                self._entries.append({
+                    'type': resource_type,
+                    'id': key[1] if key else None,
+                    'name': name,
+                    'url': item.get('url'),
+                })
+
+                lowered = name.lower()
+                self._names.append(lowered)
+
+                for word in lowered.split():
+                    for start in range(len(word)):
+                        suffixes.append((word[start:], entry_id, start == 0))
+
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, _, _ in suffixes]
+        self._postings = [(entry_id, word_start) for _, entry_id, word_start in suffixes]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _match_token(self, token: str) -> Dict[int, bool]:
+        lo = bisect.bisect_left(self._suffixes, token)
+        hi = bisect.bisect_left(self._suffixes, token + _MAX_CHAR, lo)
+
+        matches: Dict[int, bool] = {}
+        for entry_id, word_start in self._postings[lo:hi]:
+            matches[entry_id] = matches.get(entry_id, False) or word_start
+
+        return matches
+
+    def _rank(self, entry_id: int, query: str, all_word_starts: bool) -> int:
+        name = self._names[entry_id]
+
+        if name == query:
+            return 0
+        if name.startswith(query):
+            return 1
+        if query in name:
+            return 2
+        if all_word_starts:
+            return 3
+        return 4
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        query = ' '.join(query.lower().split())
+        tokens = query.split()
+        if not tokens:
+            return []
+
+        candidates: Dict[int, bool] | None = None
+
+        for token in tokens:
+            matches = self._match_token(token)
+
+            if candidates is None:
+                candidates = matches
+            else:
+                candidates = {
+                    entry_id: candidates[entry_id] and word_start
+                    for entry_id, word_start in matches.items()
+                    if entry_id in candidates
+                }
+
+            if not candidates:
+                return []
+
+        ranked = sorted(
+            candidates,
+            key=lambda entry_id: (
+                self._rank(entry_id, query, candidates[entry_id]),
+                self._names[entry_id],
+                entry_id
+            )
+        )
+
+        return [dict(self._entries[entry_id]) for entry_id in ranked]
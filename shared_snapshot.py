@@ -0,0 +1,197 @@
+import fcntl
+import json
+import mmap
+import os
+import tempfile
+import time
+from array import array
+from typing import List, Dict, Any, Optional, Callable, NamedTuple, Sequence
+
+from snapshot import SnapshotData, data_digest
+
+
+class SharedSnapshot(NamedTuple):
+    version: int
+    created_at: float
+    digest: str
+    data: Optional[SnapshotData]
+
+
+class RecordList(Sequence):
+    # One resource type inside the mapped segment. Each item is its own JSON
+    # record and is decoded only when it is read, so every worker shares the
+    # same page-cache copy instead of holding its own decoded one.
+    def __init__(self, buffer: mmap.mmap, base: int, offsets: List[int]):
+        self._buffer = buffer
+        self._offsets = array('q', (base + offset for offset in offsets))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('record index out of range')
+
+        return json.loads(self._buffer[self._offsets[index]:self._offsets[index + 1]])
+
+
+def default_snapshot_path() -> str:
+    return os.path.join(tempfile.gettempdir(), 'starwars-snapshot.bin')
+
+
+class SharedSnapshotStore:
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.ttl = ttl
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return time.time() - created_at <= self.ttl
+
+    def _read_header(self, f) -> Optional[Dict[str, Any]]:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return None
+
+        if (
+                not isinstance(header, dict)
+                or type(header.get('version')) is not int
+                or not isinstance(header.get('created_at'), (int, float))
+                or not isinstance(header.get('digest'), str)
+                or not isinstance(header.get('offsets'), dict)
+        ):
+            return None
+
+        return header
+
+    @staticmethod
+    def _valid_offsets(offsets: Dict[str, Any], size: int) -> bool:
+        for type_offsets in offsets.values():
+            if (
+                    not isinstance(type_offsets, list)
+                    or not type_offsets
+                    or any(type(offset) is not int for offset in type_offsets)
+                    or type_offsets[0] < 0
+                    or type_offsets[-1] > size
+                    or any(a > b for a, b in zip(type_offsets, type_offsets[1:]))
+            ):
+                return False
+        return True
+
+    def _read(self, known_version: Optional[int] = None) -> Optional[SharedSnapshot]:
+        try:
+            with open(self.path, 'rb') as f:
+                header = self._read_header(f)
+                if header is None:
+                    return None
+
+                if header['version'] == known_version:
+                    return SharedSnapshot(header['version'], header['created_at'], header['digest'], None)
+
+                offsets = header['offsets']
+                base = f.tell()
+                if not self._valid_offsets(offsets, os.fstat(f.fileno()).st_size - base):
+                    return None
+
+                # The mapping outlives the file object and survives the file
+                # being replaced by a newer publish.
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+        data = {
+            resource_type: RecordList(buffer, base, type_offsets)
+            for resource_type, type_offsets in offsets.items()
+        }
+        return SharedSnapshot(header['version'], header['created_at'], header['digest'], data)
+
+    def current(self, known_version: Optional[int] = None) -> Optional[SharedSnapshot]:
+        # Never crawls: returns whatever another worker last published.
+        return self._read(known_version)
+
+    def _peek_version(self) -> int:
+        try:
+            with open(self.path, 'rb') as f:
+                header = self._read_header(f)
+        except FileNotFoundError:
+            return 0
+
+        return header['version'] if header else 0
+
+    def _publish(self, data: SnapshotData) -> SharedSnapshot:
+        version = self._peek_version() + 1
+        created_at = time.time()
+
+        records: List[bytes] = []
+        offsets: Dict[str, List[int]] = {}
+        size = 0
+        for resource_type, items in data.items():
+            type_offsets = [size]
+            for item in items:
+                record = json.dumps(item, separators=(',', ':')).encode('utf-8')
+                records.append(record)
+                size += len(record)
+                type_offsets.append(size)
+            offsets[resource_type] = type_offsets
+
+        # Record offsets are relative to the end of this header line.
+        digest = data_digest(data)
+        header = {'version': version, 'created_at': created_at, 'digest': digest, 'offsets': offsets}
+
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.starwars-snapshot-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                for record in records:
+                    f.write(record)
+            # Readers that already mapped the old file keep reading it.
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        # Serve the mapped copy too, so the crawling worker does not keep the
+        # decoded crawl around either.
+        return self._read() or SharedSnapshot(version, created_at, digest, data)
+
+    def load(
+            self,
+            loader: Callable[[], SnapshotData],
+            known_version: Optional[int] = None,
+            force: bool = False
+    ) -> Optional[SharedSnapshot]:
+        seen_version = self._peek_version()
+
+        if not force:
+            shared = self._read(known_version)
+            if shared and self._is_fresh(shared.created_at):
+                return shared
+
+        with open(self.lock_path, 'a') as lock_file:
+            # A worker that still has a (stale) snapshot keeps serving it while
+            # another worker crawls, instead of queueing behind that crawl.
+            flags = fcntl.LOCK_EX
+            if known_version is not None and not force:
+                flags |= fcntl.LOCK_NB
+
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                return None
+
+            try:
+                # Another worker may have published while we waited for the lock.
+                shared = self._read(known_version)
+                if shared and self._is_fresh(shared.created_at) and (not force or shared.version > seen_version):
+                    return shared
+
+                return self._publish(loader())
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Sequence, Mapping, Callable
+
+from relationship_graph import RelationshipGraph
+from resources import parse_resource_url
+from bitmap_index import BitmapIndex
+from fuzzy_index import FuzzyIndex
+from search_index import SearchIndex
+from sqlite_backend import SQLiteQueryEngine
+
+
+SnapshotData = Mapping[str, Sequence[Dict[str, Any]]]
+
+
+def data_digest(data: SnapshotData) -> str:
+    encoded = json.dumps({key: list(items) for key, items in data.items()}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]
+
+
+class Selection(Sequence):
+    # Items of one resource type picked by position. Only the positions are
+    # kept, so items backed by a shared segment are decoded on access.
+    def __init__(self, items: Sequence[Dict[str, Any]], positions: List[int]):
+        self._items = items
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[position] for position in self._positions[index]]
+        return self._items[self._positions[index]]
+
+
+class Snapshot:
+    def __init__(self, version: int, data: SnapshotData, digest: Optional[str] = None):
+        self.version = version
+        self.data = data
+        # The version is a per-process counter; the digest identifies the crawl
+        # itself, so cursors minted by another process or instance still resolve.
+        self.digest = digest or data_digest(data)
+        self._by_id: Optional[Dict[str, Dict[int, int]]] = None
+        self._search_index = None
+        self._graph = None
+        self._sqlite_engine = None
+        self._fuzzy_index = None
+        self._bitmap_index = None
+        self.orderings: OrderedDict[Tuple, Selection] = OrderedDict()
+        self.responses: OrderedDict[Tuple, Any] = OrderedDict()
+        # Responses rendered by warmup are pinned here and never evicted.
+        self.warmed: Dict[Tuple, Any] = {}
+        self.cache_lock = threading.Lock()
+        self._index_locks = {
+            attribute: threading.Lock()
+            for attribute in ('_search_index', '_graph', '_sqlite_engine', '_fuzzy_index', '_bitmap_index')
+        }
+
+    def items(self, resource_type: str) -> Sequence[Dict[str, Any]]:
+        return self.data.get(resource_type, [])
+
+    def find(self, resource_type: str, resource_id: int) -> Optional[Dict[str, Any]]:
+        if self._by_id is None:
+            by_id: Dict[str, Dict[int, int]] = {}
+            for type_name, items in self.data.items():
+                index = by_id.setdefault(type_name, {})
+                for position, item in enumerate(items):
+                    key = parse_resource_url(item.get('url'))
+                    if key:
+                        index[key[1]] = position
+            self._by_id = by_id
+
+        position = self._by_id.get(resource_type, {}).get(resource_id)
+        return None if position is None else self.items(resource_type)[position]
+
+    def _index(self, attribute: str, build: Callable[[SnapshotData], Any]) -> Any:
+        index = getattr(self, attribute)
+        if index is None:
+            # Warmup and requests race to build the same index for a new
+            # snapshot; each one is built once, without blocking the others.
+            with self._index_locks[attribute]:
+                index = getattr(self, attribute)
+                if index is None:
+                    index = build(self.data)
+                    setattr(self, attribute, index)
+        return index
+
+    @property
+    def search_index(self) -> SearchIndex:
+        return self._index('_search_index', SearchIndex)
+
+    @property
+    def graph(self) -> RelationshipGraph:
+        return self._index('_graph', RelationshipGraph)
+
+    @property
+    def sqlite_engine(self) -> SQLiteQueryEngine:
+        return self._index('_sqlite_engine', SQLiteQueryEngine)
+
+    @property
+    def fuzzy_index(self) -> FuzzyIndex:
+        return self._index('_fuzzy_index', FuzzyIndex)
+
+    @property
+    def bitmap_index(self) -> BitmapIndex:
+        return self._index('_bitmap_index', BitmapIndex)
@@ -0,0 +1,208 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from resources import RESOURCE_TYPES, name_field, parse_resource_url
+
+_SCHEMA = """
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY,
+    resource_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name_lower TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX items_type_position ON items (resource_type, position);
+
+CREATE TABLE item_fields (
+    item_id INTEGER NOT NULL,
+    resource_type TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value NOT NULL,
+    present INTEGER NOT NULL
+);
+CREATE INDEX item_fields_sort ON item_fields (resource_type, field, value, item_id);
+CREATE UNIQUE INDEX item_fields_item ON item_fields (item_id, field);
+
+CREATE TABLE item_films (
+    item_id INTEGER NOT NULL,
+    film_id INTEGER NOT NULL
+);
+CREATE INDEX item_films_film ON item_films (film_id, item_id);
+"""
+
+_MIN_TRIGRAM_TERM = 3
+
+TOTALS_CACHE_SIZE = 256
+
+
+def _sortable_fields(items: List[Dict[str, Any]]) -> Dict[str, type]:
+    kinds: Dict[str, set] = {}
+    for item in items:
+        for field, value in item.items():
+            kinds.setdefault(field, set()).add(type(value))
+
+    sortable = {}
+    for field, field_kinds in kinds.items():
+        if field_kinds == {str}:
+            sortable[field] = str
+        elif field_kinds == {int} and all(field in item for item in items):
+            sortable[field] = int
+
+    return sortable
+
+
+class SQLiteQueryEngine:
+    def __init__(self, data: Dict[str, List[Dict[str, Any]]]):
+        self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._lock = threading.Lock()
+        self._sortable: Dict[str, Dict[str, type]] = {}
+        self._totals: OrderedDict[Tuple, int] = OrderedDict()
+
+        self._conn.executescript(_SCHEMA)
+        self.fts = self._create_fts_table()
+        self._load(data)
+
+    def _create_fts_table(self) -> bool:
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE item_names USING fts5(name, tokenize='trigram')")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _load(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        item_rows, field_rows, film_rows, name_rows = [], [], [], []
+        item_id = 0
+
+        for resource_type in RESOURCE_TYPES:
+            items = data.get(resource_type, [])
+            sortable = _sortable_fields(items)
+            self._sortable[resource_type] = sortable
+
+            for position, item in enumerate(items):
+                item_id += 1
+                name = item.get(name_field(resource_type), '')
+
+                item_rows.append((item_id, resource_type, position, name.lower(), json.dumps(item)))
+                name_rows.append((item_id, name))
+
+                # Missing string values sort as "" (like the in-memory path), so they
+                # are stored that way and the sort never needs COALESCE.
+                for field in sortable:
+                    field_rows.append((item_id, resource_type, field, item.get(field, ''), int(field in item)))
+
+                for url in item.get('films', []) if 'films' in item else []:
+                    key = parse_resource_url(url)
+                    if key and key[0] == 'films':
+                        film_rows.append((item_id, key[1]))
+
+        with self._conn:
+            self._conn.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?)", item_rows)
+            self._conn.executemany("INSERT INTO item_fields VALUES (?, ?, ?, ?, ?)", field_rows)
+            self._conn.executemany("INSERT INTO item_films VALUES (?, ?)", film_rows)
+            if self.fts:
+                self._conn.executemany("INSERT INTO item_names (rowid, name) VALUES (?, ?)", name_rows)
+
+    def _where(
+            self,
+            resource_type: str,
+            filter_term: Optional[str],
+            film_id: Optional[int]
+    ) -> Tuple[str, List[Any]]:
+        clauses = ["i.resource_type = ?"]
+        params: List[Any] = [resource_type]
+
+        if film_id:
+            clauses.append("i.id IN (SELECT item_id FROM item_films WHERE film_id = ?)")
+            params.append(film_id)
+
+        if filter_term:
+            term = filter_term.lower()
+            if self.fts and len(term) >= _MIN_TRIGRAM_TERM:
+                clauses.append("i.id IN (SELECT rowid FROM item_names WHERE item_names MATCH ?)")
+                params.append('"' + term.replace('"', '""') + '"')
+            else:
+                # Terms shorter than a trigram cannot use the FTS index.
+                clauses.append("instr(i.name_lower, ?) > 0")
+                params.append(term)
+
+        return " AND ".join(clauses), params
+
+    def _select(
+            self,
+            resource_type: str,
+            filter_term: Optional[str],
+            sort_by: Optional[str],
+            film_id: Optional[int]
+    ) -> Tuple[str, List[Any]]:
+        where, params = self._where(resource_type, filter_term, film_id)
+
+        if sort_by is None:
+            return f"SELECT i.body FROM items i WHERE {where} ORDER BY i.position LIMIT ? OFFSET ?", params
+
+        # Driven by item_fields_sort, so rows come out already ordered.
+        return (
+            f"SELECT i.body FROM item_fields f JOIN items i ON i.id = f.item_id "
+            f"WHERE f.resource_type = ? AND f.field = ? AND {where} "
+            f"ORDER BY f.value, f.item_id LIMIT ? OFFSET ?",
+            [resource_type, sort_by] + params
+        )
+
+    def query_plan(
+            self,
+            resource_type: str,
+            filter_term: Optional[str] = None,
+            sort_by: Optional[str] = None,
+            film_id: Optional[int] = None
+    ) -> List[str]:
+        sql, params = self._select(resource_type, filter_term, sort_by, film_id)
+        with self._lock:
+            rows = self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params + [1, 0]).fetchall()
+        return [row[-1] for row in rows]
+
+    def query(
+            self,
+            resource_type: str,
+            filter_term: Optional[str],
+            sort_by: Optional[str],
+            page: int,
+            size: int,
+            film_id: Optional[int] = None
+    ) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        if sort_by and sort_by not in self._sortable.get(resource_type, {}):
+            # Lists, mixed types or unknown keys: leave those to the in-memory path.
+            return None
+
+        where, params = self._where(resource_type, filter_term, film_id)
+        offset = (max(1, page) - 1) * size
+        total_key = (resource_type, filter_term.lower() if filter_term else None, film_id)
+
+        with self._lock:
+            # The snapshot never changes, so recent filters are not recounted
+            # while a client pages through them.
+            total_items = self._totals.get(total_key)
+            if total_items is not None:
+                self._totals.move_to_end(total_key)
+            else:
+                total_items = self._conn.execute(f"SELECT COUNT(*) FROM items i WHERE {where}", params).fetchone()[0]
+                self._totals[total_key] = total_items
+                while len(self._totals) > TOTALS_CACHE_SIZE:
+                    self._totals.popitem(last=False)
+
+            if sort_by and not self._first_has_field(where, params, sort_by):
+                sort_by = None
+
+            sql, params = self._select(resource_type, filter_term, sort_by, film_id)
+            rows = self._conn.execute(sql, params + [size, offset]).fetchall()
+
+        return [json.loads(body) for (body,) in rows], total_items
+
+    def _first_has_field(self, where: str, params: List[Any], field: str) -> bool:
+        row = self._conn.execute(
+            f"SELECT (SELECT present FROM item_fields WHERE item_id = i.id AND field = ?) "
+            f"FROM items i WHERE {where} ORDER BY i.position LIMIT 1",
+            [field] + params
+        ).fetchone()
+        return bool(row and row[0])
@@ -1,12 +1,62 @@
 import os
-from flask import jsonify, Request
-from typing import Tuple, Dict, Any
-from starwars_service import StarWarsService
+from flask import jsonify, Request, Response
+from typing import Tuple, Dict, Any, Optional
+
+from admission_control import AdmissionController
+from bitmap_index import FILTERABLE_FIELDS
+from cursor import CursorExpiredError
+from errors import QueryValidationError, SnapshotBusyError
+from starwars_service import StarWarsService, MATCH_MODES
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
 
 
 class StarWarsController:
-    def __init__(self, service: StarWarsService):
+    def __init__(
+            self,
+            service: StarWarsService,
+            admission: Optional[AdmissionController] = None,
+            trusted_proxies: int = 0
+    ):
         self.service = service
+        self.admission = admission
+        self.trusted_proxies = trusted_proxies
+
+    def _client_key(self, request: Request) -> str:
+        api_key = request.args.get('key') or request.headers.get('X-API-Key')
+        if api_key:
+            return f"key:{api_key}"
+
+        # Clients can prepend anything to X-Forwarded-For; only the hop added
+        # by the outermost trusted proxy names the real peer.
+        hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if self.trusted_proxies and len(hops) >= self.trusted_proxies:
+            return f"ip:{hops[-self.trusted_proxies]}"
+        return f"ip:{request.remote_addr}"
+
+    @staticmethod
+    def _query_options(request_args) -> Dict[str, Any]:
+        # Only listings, exports and cursors take these; other routes ignore them.
+        query_options = {}
+
+        match = request_args.get('match', 'exact').lower()
+        if match not in MATCH_MODES:
+            raise QueryValidationError(f'Match mode "{match}" not supported.')
+        if match != 'exact':
+            query_options['match'] = match
+
+        field_filters = {
+            field: request_args.getlist(field)
+            for field in request_args
+            if field in FILTERABLE_FIELDS
+        }
+        if field_filters:
+            query_options['field_filters'] = field_filters
+
+        return query_options
 
     def handle_request(self, request: Request) -> Tuple[Any, int, Dict[str, str]]:
         cors_headers = {
@@ -22,6 +72,25 @@ class StarWarsController:
             }
             return '', 204, options_headers
 
+        # Requests answered from the in-memory snapshot are always admitted;
+        # only requests that would crawl or wait on a crawl are limited.
+        if self.admission is None or not self.service.needs_load():
+            return self._dispatch(request, cors_headers)
+
+        retry_after = self.admission.check_rate(self._client_key(request))
+        if retry_after is not None:
+            return jsonify({'error': 'Too Many Requests'}), 429, {**cors_headers, 'Retry-After': str(retry_after)}
+
+        retry_after = self.admission.try_enter()
+        if retry_after is not None:
+            return jsonify({'error': 'Service Unavailable'}), 503, {**cors_headers, 'Retry-After': str(retry_after)}
+
+        try:
+            return self._dispatch(request, cors_headers)
+        finally:
+            self.admission.leave()
+
+    def _dispatch(self, request: Request, cors_headers: Dict[str, str]) -> Tuple[Any, int, Dict[str, str]]:
         configured_base_url = os.environ.get('BASE_URL', '').rstrip('/')
 
         if configured_base_url:
@@ -41,6 +110,8 @@ class StarWarsController:
 
         resource_type = None
         resource_id = None
+        related = False
+        export = False
 
         if not path_segments:
             resource_type = request.args.get('type', 'people')
@@ -48,8 +119,13 @@ class StarWarsController:
         elif len(path_segments) == 1:
             resource_type = path_segments[0]
 
-        elif len(path_segments) == 2:
+        elif len(path_segments) == 2 and path_segments[0] == 'export':
+            resource_type = path_segments[1]
+            export = True
+
+        elif len(path_segments) == 2 or (len(path_segments) == 3 and path_segments[2] == 'related'):
             resource_type = path_segments[0]
+            related = len(path_segments) == 3
             try:
                 resource_id = int(path_segments[1])
             except ValueError:
@@ -72,6 +148,44 @@ class StarWarsController:
             return jsonify({'error': 'film_id must be an integer'}), 400, cors_headers
 
         try:
+            if export:
+                export_format = request_args.get('format', 'ndjson').lower()
+                if export_format not in EXPORT_MIMETYPES:
+                    return jsonify({'error': f'Export format "{export_format}" not supported.'}), 400, cors_headers
+
+                fields = [f.strip() for f in request_args.get('fields', '').split(',') if f.strip()] or None
+                query_options = self._query_options(request_args)
+
+                rows = self.service.export_resource(
+                    resource_type, filter_term, sort_by, fields, export_format,
+                    base_url=current_base_url, film_id=film_id, **query_options
+                )
+                if rows is None:
+                    return jsonify({
+                        'error': f'Resource type "{resource_type}" not supported.'
+                    }), 400, cors_headers
+
+                return Response(rows, mimetype=EXPORT_MIMETYPES[export_format]), 200, cors_headers
+
+            if related:
+                paths = [
+                    [hop for hop in path.split('.') if hop]
+                    for path in request_args.getlist('path')
+                ]
+                paths = [path for path in paths if path]
+                if not paths:
+                    return jsonify({'error': 'Query parameter "path" is required'}), 400, cors_headers
+
+                try:
+                    data = self.service.get_related(resource_type, resource_id, paths, page, size,
+                                                    base_url=current_base_url)
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400, cors_headers
+
+                if data is None:
+                    return jsonify({'error': 'Not Found'}), 404, cors_headers
+                return jsonify(data), 200, cors_headers
+
             if resource_id:
 
                 item = self.service.get_resource_by_id(resource_type, resource_id, current_base_url)
@@ -80,21 +194,42 @@ class StarWarsController:
                 else:
                     return jsonify({'error': 'Not Found'}), 404, cors_headers
 
+            cursor = request_args.get('cursor')
+            if cursor:
+                self._query_options(request_args)
+                try:
+                    data = self.service.get_page_by_cursor(resource_type, cursor, base_url=current_base_url)
+                except CursorExpiredError as e:
+                    return jsonify({'error': str(e)}), 410, cors_headers
+                except SnapshotBusyError as e:
+                    return jsonify({'error': str(e)}), 503, {**cors_headers, 'Retry-After': '1'}
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400, cors_headers
+                return jsonify(data), 200, cors_headers
+
             data = {}
             rt = resource_type.lower()
+            query_options = {} if rt in ('search', '_warmup') else self._query_options(request_args)
 
             if rt in ['people', 'person']:
-                data = self.service.get_people(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id)
+                data = self.service.get_people(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id, **query_options)
             elif rt in ['planets', 'planet']:
-                data = self.service.get_planets(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id)
+                data = self.service.get_planets(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id, **query_options)
             elif rt in ['starships', 'starship']:
-                data = self.service.get_starships(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id)
+                data = self.service.get_starships(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id, **query_options)
             elif rt in ['films', 'film']:
-                data = self.service.get_films(filter_term, sort_by, page, size, base_url=current_base_url)
+                data = self.service.get_films(filter_term, sort_by, page, size, base_url=current_base_url, **query_options)
             elif rt in ['species', 'specie']:
-                data = self.service.get_species(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id)
+                data = self.service.get_species(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id, **query_options)
             elif rt in ['vehicles', 'vehicle']:
-                data = self.service.get_vehicles(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id)
+                data = self.service.get_vehicles(filter_term, sort_by, page, size, base_url=current_base_url, film_id=film_id, **query_options)
+            elif rt == '_warmup':
+                data = self.service.warmup(base_url=current_base_url)
+            elif rt == 'search':
+                query = request_args.get('q')
+                if not query:
+                    return jsonify({'error': 'Query parameter "q" is required'}), 400, cors_headers
+                data = self.service.search(query, page, size, base_url=current_base_url)
             else:
                 return jsonify({
                     'error': f'Resource type "{resource_type}" not supported.'
@@ -102,5 +237,8 @@ class StarWarsController:
 
             return jsonify(data), 200, cors_headers
 
+        except QueryValidationError as e:
+            return jsonify({'error': str(e)}), 400, cors_headers
+
         except Exception as e:
             return jsonify({'error': str(e)}), 500, cors_headers
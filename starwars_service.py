@@ -1,68 +1,386 @@
+import csv
+import io
+import itertools
 import json
 import math
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator, NamedTuple, Callable, Sequence
+from urllib.parse import parse_qsl
 
+from bitmap_index import FILTERABLE_FIELDS, FieldFilters, bitmap_positions, normalize_filters
+from cursor import CursorExpiredError, decode_cursor, encode_cursor
+from errors import QueryValidationError, SnapshotBusyError
 from model.films import Film
 from model.person import Person
 from model.planet import Planet
 from model.specie import Specie
 from model.starship import Starship
 from model.vehicle import Vehicle
+from resources import RESOURCE_TYPES, canonical_resource_type, name_field, parse_resource_url
+from shared_snapshot import SharedSnapshot, SharedSnapshotStore
+from snapshot import Selection, Snapshot
 from swapi_client import SWAPIClient
 
+DEFAULT_SNAPSHOT_TTL = 3600.0
+
+DEFAULT_SNAPSHOT_RETENTION = 3
+
+ORDERING_CACHE_SIZE = 256
+
+RESPONSE_CACHE_SIZE = 1024
+
+DEFAULT_WARMUP_TOP_IDS = 10
+
+WARMUP_WORKERS = len(RESOURCE_TYPES)
+
+_MISSING = object()
+
+QUERY_BACKENDS = ('memory', 'sqlite')
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+MATCH_MODES = ('exact', 'fuzzy')
+
+
+class ListQuery(NamedTuple):
+    resource_type: str
+    filter_term: Optional[str] = None
+    sort_by: Optional[str] = None
+    film_id: Optional[int] = None
+    match: str = 'exact'
+    field_filters: FieldFilters = ()
+
+    @classmethod
+    def from_cursor(cls, values: Any) -> 'ListQuery':
+        if not isinstance(values, list) or len(values) != len(cls._fields):
+            raise QueryValidationError('Invalid cursor')
+
+        resource_type, filter_term, sort_by, film_id, match, filters = values
+        if (
+                not isinstance(resource_type, str)
+                or not isinstance(filter_term, (str, type(None)))
+                or not isinstance(sort_by, (str, type(None)))
+                or type(film_id) not in (int, type(None))
+                or not isinstance(match, str)
+                or not isinstance(filters, list)
+                or not all(_is_cursor_filter(entry) for entry in filters)
+        ):
+            raise QueryValidationError('Invalid cursor')
+
+        field_filters = tuple((field, tuple(tokens)) for field, tokens in filters)
+        if (
+                canonical_resource_type(resource_type) != resource_type
+                or match not in MATCH_MODES
+                or field_filters != normalize_filters(dict(field_filters))
+        ):
+            raise QueryValidationError('Invalid cursor')
+
+        return cls(resource_type, filter_term, sort_by, film_id, match, field_filters)
+
+
+def _is_cursor_filter(entry: Any) -> bool:
+    return (
+            isinstance(entry, list)
+            and len(entry) == 2
+            and isinstance(entry[0], str)
+            and isinstance(entry[1], list)
+            and all(isinstance(token, str) for token in entry[1])
+    )
+
 
 class StarWarsService:
-    def __init__(self, client: Optional[SWAPIClient] = None):
+    def __init__(
+            self,
+            client: Optional[SWAPIClient] = None,
+            snapshot_ttl: float = DEFAULT_SNAPSHOT_TTL,
+            snapshot_store: Optional[SharedSnapshotStore] = None,
+            query_backend: str = 'memory',
+            snapshot_retention: int = DEFAULT_SNAPSHOT_RETENTION,
+            warmup_base_url: Optional[str] = None,
+            warmup_queries: Optional[List[str]] = None,
+            warmup_top_ids: int = DEFAULT_WARMUP_TOP_IDS
+    ):
+        if query_backend not in QUERY_BACKENDS:
+            raise ValueError(f'Query backend "{query_backend}" not supported.')
+
         self.client = client or SWAPIClient()
+        self.query_backend = query_backend
+        self.snapshot_ttl = snapshot_ttl
+        self.snapshot_store = snapshot_store
+        self._snapshot: Optional[Snapshot] = None
+        self._snapshot_loaded_at = 0.0
+        self._snapshot_lock = threading.Lock()
+        self.snapshot_retention = max(1, snapshot_retention)
+        self._retained_snapshots: OrderedDict[str, Snapshot] = OrderedDict()
+        self.warmup_base_url = warmup_base_url
+        self.warmup_queries = warmup_queries
+        self.warmup_top_ids = warmup_top_ids
 
-    def get_resource_by_id(self, resource_type: str, resource_id: int, base_url: str) -> dict[str, Any] | None:
-        data = []
-        if resource_type in ['people', 'person']:
-            data = self.client.get_people()
-        elif resource_type in ['planets', 'planet']:
-            data = self.client.get_planets()
-        elif resource_type in ['starships', 'starship']:
-            data = self.client.get_starships()
-        elif resource_type in ['films', 'film']:
-            data = self.client.get_films()
-        elif resource_type in ['species', 'specie']:
-            data = self.client.get_species()
-        elif resource_type in ['vehicles', 'vehicle']:
-            data = self.client.get_vehicles()
+    def _snapshot_expired(self) -> bool:
+        return time.monotonic() - self._snapshot_loaded_at > self.snapshot_ttl
+
+    def _crawl(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            resource_type: getattr(self.client, f"get_{resource_type}")()
+            for resource_type in RESOURCE_TYPES
+        }
+
+    def _set_snapshot(self, snapshot: Snapshot) -> None:
+        # Older crawls stay reachable so cursors survive a refresh.
+        self._retained_snapshots.pop(snapshot.digest, None)
+        self._retained_snapshots[snapshot.digest] = snapshot
+        while len(self._retained_snapshots) > self.snapshot_retention:
+            self._retained_snapshots.popitem(last=False)
+
+        self._snapshot = snapshot
+
+    def _load_snapshot(self, force: bool = False) -> Snapshot:
+        previous = self._snapshot
+
+        if self.snapshot_store is None:
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            self._set_snapshot(Snapshot(version, self._crawl()))
+            self._snapshot_loaded_at = time.monotonic()
         else:
+            known_version = self._snapshot.version if self._snapshot else None
+            shared = self.snapshot_store.load(self._crawl, known_version=known_version, force=force)
+
+            if shared is not None:
+                self._adopt_shared(shared)
+
+        if self.warmup_base_url is not None and self._snapshot is not previous:
+            threading.Thread(target=self.warmup, args=(self.warmup_base_url,), daemon=True).start()
+
+        return self._snapshot
+
+    def _adopt_shared(self, shared: SharedSnapshot) -> None:
+        if shared.data is not None:
+            self._set_snapshot(Snapshot(shared.version, shared.data, shared.digest))
+        self._snapshot_loaded_at = time.monotonic() - max(0.0, time.time() - shared.created_at)
+
+    def _catch_up(self, digest: str) -> None:
+        # Another worker may already have published the crawl this cursor was
+        # minted on. Only adopt what is in the store; never crawl for a cursor.
+        if not self._snapshot_lock.acquire(blocking=False):
+            raise SnapshotBusyError('Snapshot is being reloaded, retry shortly')
+
+        try:
+            if digest in self._retained_snapshots:
+                return
+
+            previous = self._snapshot
+            shared = self.snapshot_store.current(known_version=previous.version)
+            if shared is not None and shared.data is not None:
+                self._adopt_shared(shared)
+                if self.warmup_base_url is not None:
+                    threading.Thread(target=self.warmup, args=(self.warmup_base_url,), daemon=True).start()
+        finally:
+            self._snapshot_lock.release()
+
+    def refresh_snapshot(self) -> Snapshot:
+        with self._snapshot_lock:
+            return self._load_snapshot(force=True)
+
+    def needs_load(self) -> bool:
+        # True when get_snapshot() would crawl or wait for a crawl. An expired
+        # snapshot whose refresh is already running is served stale instead.
+        if self._snapshot is None:
+            return True
+        return self._snapshot_expired() and not self._snapshot_lock.locked()
+
+    def get_snapshot(self) -> Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._snapshot_expired():
+            return snapshot
+
+        # Keep serving the stale snapshot while another thread crawls SWAPI.
+        if not self._snapshot_lock.acquire(blocking=snapshot is None):
+            return snapshot
+
+        try:
+            if self._snapshot is None or self._snapshot_expired():
+                self._load_snapshot()
+            return self._snapshot
+        finally:
+            self._snapshot_lock.release()
+
+    def get_resource_by_id(self, resource_type: str, resource_id: int, base_url: str) -> dict[str, Any] | None:
+        resource_type = canonical_resource_type(resource_type)
+        if resource_type is None:
             return None
 
-        target_suffix = f"/{resource_id}/"
+        return self._render_resource(self.get_snapshot(), resource_type, resource_id, base_url)
 
-        found_item = next((item for item in data if item['url'].endswith(target_suffix)), None)
+    def _render_resource(
+            self,
+            snapshot: Snapshot,
+            resource_type: str,
+            resource_id: int,
+            base_url: str,
+            pin: bool = False
+    ) -> dict[str, Any] | None:
+        def render() -> dict[str, Any] | None:
+            found_item = snapshot.find(resource_type, resource_id)
 
-        if found_item:
-            return self._replace_urls(found_item, base_url)
+            if found_item:
+                return self._replace_urls(found_item, base_url)
 
-        return None
+            return None
+
+        return self._cached_response(snapshot, ('resource', resource_type, resource_id, base_url), render, pin)
+
+    def search(self, query: str, page: int = 1, size: int = 10, base_url: str = "") -> Dict[str, Any]:
+        hits = self.get_snapshot().search_index.search(query)
+        return self._paginate(hits, page, size, base_url)
+
+    def get_related(
+            self,
+            resource_type: str,
+            resource_id: int,
+            paths: List[List[str]],
+            page: int = 1,
+            size: int = 10,
+            base_url: str = ""
+    ) -> Dict[str, Any] | None:
+        resource_type = canonical_resource_type(resource_type)
+        if resource_type is None:
+            return None
+
+        graph = self.get_snapshot().graph
+        start = graph.node_id(resource_type, resource_id)
+        if start is None:
+            return None
+
+        nodes = None
+        for path in paths:
+            reached = graph.traverse({start}, path)
+            nodes = reached if nodes is None else nodes & reached
+
+        return self._paginate(graph.items(nodes or set()), page, size, base_url)
+
+    def export_resource(
+            self,
+            resource_type: str,
+            filter_term: Optional[str] = None,
+            sort_by: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+            export_format: str = 'ndjson',
+            base_url: str = "",
+            film_id: Optional[int] = None,
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
+    ) -> Iterator[str] | None:
+        resource_type = canonical_resource_type(resource_type)
+        if resource_type is None:
+            return None
+
+        if export_format not in EXPORT_FORMATS:
+            raise QueryValidationError(f'Export format "{export_format}" not supported.')
+
+        if match not in MATCH_MODES:
+            raise QueryValidationError(f'Match mode "{match}" not supported.')
+
+        query = ListQuery(
+            resource_type, filter_term, sort_by,
+            film_id if resource_type != 'films' else None,
+            match, normalize_filters(field_filters)
+        )
+
+        # Stream straight from the snapshot; only a sort needs every position
+        # up front. Exports are one-off, so they stay out of the ordering cache.
+        snapshot = self.get_snapshot()
+        records = snapshot.items(resource_type)
+        positions: Iterable[int] = self._matching_positions(snapshot, query)
+        if sort_by:
+            positions = self._sort_positions(records, list(positions), sort_by)
+
+        items: Iterable[Dict] = (records[position] for position in positions)
+
+        if fields:
+            items = ({field: item[field] for field in fields if field in item} for item in items)
+
+        encoded = self._encode_csv(items, fields) if export_format == 'csv' else self._encode_ndjson(items)
+
+        return (self._replace_urls_in_text(chunk, base_url) for chunk in encoded)
 
     @staticmethod
-    def _replace_urls(data: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    def _encode_ndjson(items: Iterable[Dict]) -> Iterator[str]:
+        for item in items:
+            yield json.dumps(item) + "\n"
+
+    @staticmethod
+    def _encode_csv(items: Iterable[Dict], fields: Optional[List[str]] = None) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def encode_row(values: List[Any]) -> str:
+            writer.writerow(values)
+            row = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return row
+
+        items = iter(items)
+        first = next(items, None)
+
+        columns = fields or (list(first.keys()) if first else [])
+        if columns:
+            yield encode_row(columns)
+
+        if first is None:
+            return
+
+        for item in itertools.chain([first], items):
+            values = []
+            for column in columns:
+                value = item.get(column)
+                if isinstance(value, list):
+                    value = ' '.join(str(v) for v in value)
+                values.append('' if value is None else value)
+
+            yield encode_row(values)
+
+    @staticmethod
+    def _replace_urls_in_text(text: str, base_url: str) -> str:
         if not base_url:
-            return data
+            return text
 
         my_api_url = base_url.rstrip('/')
 
+        text = text.replace("https://swapi.dev/api", my_api_url)
+        return text.replace("http://swapi.dev/api", my_api_url)
+
+    @staticmethod
+    def _replace_urls(data: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        if not base_url:
+            return data
+
         json_str = json.dumps(data)
 
-        new_json_str = json_str.replace("https://swapi.dev/api", my_api_url)
-        new_json_str = new_json_str.replace("http://swapi.dev/api", my_api_url)
+        new_json_str = StarWarsService._replace_urls_in_text(json_str, base_url)
 
         return json.loads(new_json_str)
 
     def _paginate(self, data: List[Dict], page: int, size: int, base_url: str = "") -> Dict[str, Any]:
-        total_items = len(data)
-        total_pages = math.ceil(total_items / size)
         page = max(1, page)
         start_index = (page - 1) * size
         end_index = start_index + size
 
-        paginated_items = data[start_index:end_index]
+        return self._page_result(data[start_index:end_index], len(data), page, size, base_url)
+
+    def _page_result(
+            self,
+            paginated_items: List[Dict],
+            total_items: int,
+            page: int,
+            size: int,
+            base_url: str = ""
+    ) -> Dict[str, Any]:
+        total_pages = math.ceil(total_items / size)
+        page = max(1, page)
 
         result = {
             "data": paginated_items,
@@ -76,40 +394,272 @@ class StarWarsService:
 
         return self._replace_urls(result, base_url)
 
-    def _process_resource(
-            self,
-            data: List[Dict],
+    @staticmethod
+    def _filter_positions(
+            items: Sequence[Dict],
+            positions: Iterable[int],
             filter_term: Optional[str],
             filter_field: str,
-            sort_by: Optional[str],
+            film_id: Optional[int] = None
+    ) -> Iterator[int]:
+        target_suffix = f"/films/{film_id}/"
+        term = filter_term.lower() if filter_term else None
+
+        for position in positions:
+            if not (film_id or term):
+                yield position
+                continue
+
+            item = items[position]
+            if film_id and not ('films' in item and any(url.endswith(target_suffix) for url in item.get('films', []))):
+                continue
+
+            if term and term not in item.get(filter_field, '').lower():
+                continue
+
+            yield position
+
+    @staticmethod
+    def _sort_positions(items: Sequence[Dict], positions: List[int], sort_by: Optional[str]) -> List[int]:
+        if sort_by and positions:
+            if sort_by in items[positions[0]]:
+                # Only the sort keys are held, never the items themselves.
+                keys = [items[position].get(sort_by, "") for position in positions]
+                try:
+                    order = sorted(range(len(positions)), key=keys.__getitem__)
+                except TypeError:
+                    return positions
+                return [positions[index] for index in order]
+
+        return positions
+
+    def _matching_positions(self, snapshot: Snapshot, query: ListQuery) -> Iterator[int]:
+        items = snapshot.items(query.resource_type)
+        filter_term = query.filter_term
+        positions: Iterable[int] = range(len(items))
+
+        if query.match == 'fuzzy' and filter_term:
+            positions = snapshot.fuzzy_index.search(query.resource_type, filter_term)
+            filter_term = None
+
+        if query.field_filters:
+            bitmap = snapshot.bitmap_index.match(query.resource_type, query.field_filters)
+            if isinstance(positions, range):
+                positions = bitmap_positions(bitmap)
+            else:
+                positions = [position for position in positions if bitmap >> position & 1]
+
+        return self._filter_positions(items, positions, filter_term, name_field(query.resource_type), query.film_id)
+
+    def _ordering(self, snapshot: Snapshot, query: ListQuery) -> Selection:
+        with snapshot.cache_lock:
+            ordering = snapshot.orderings.get(query)
+            if ordering is not None:
+                snapshot.orderings.move_to_end(query)
+
+        if ordering is None:
+            items = snapshot.items(query.resource_type)
+            positions = self._sort_positions(items, list(self._matching_positions(snapshot, query)), query.sort_by)
+            ordering = Selection(items, positions)
+            with snapshot.cache_lock:
+                snapshot.orderings[query] = ordering
+                while len(snapshot.orderings) > ORDERING_CACHE_SIZE:
+                    snapshot.orderings.popitem(last=False)
+
+        return ordering
+
+    @staticmethod
+    def _next_cursor(
+            snapshot: Snapshot,
+            query: ListQuery,
+            position: int,
+            size: int,
+            total_items: int
+    ) -> Optional[str]:
+        if position >= total_items or size < 1:
+            return None
+
+        return encode_cursor({
+            'v': snapshot.digest,
+            'q': list(query),
+            'p': position,
+            'n': size,
+        })
+
+    def get_page_by_cursor(self, resource_type: str, cursor: str, base_url: str = "") -> Dict[str, Any]:
+        state = decode_cursor(cursor)
+        query = ListQuery.from_cursor(state['q'])
+
+        if canonical_resource_type(resource_type) != query.resource_type:
+            raise QueryValidationError('Cursor does not belong to this resource type')
+
+        current = self.get_snapshot()
+        if (
+                current.digest != state['v']
+                and state['v'] not in self._retained_snapshots
+                and self.snapshot_store is not None
+        ):
+            self._catch_up(state['v'])
+            current = self._snapshot
+
+        snapshot = current if current.digest == state['v'] else self._retained_snapshots.get(state['v'])
+        if snapshot is None:
+            raise CursorExpiredError('Cursor refers to a snapshot that is no longer available')
+
+        ordering = self._ordering(snapshot, query)
+        position, size = state['p'], state['n']
+        end = position + size
+
+        result = {
+            "data": ordering[position:end],
+            "meta": {
+                "per_page": size,
+                "total_items": len(ordering),
+                "snapshot_version": snapshot.version,
+                "next_cursor": self._next_cursor(snapshot, query, end, size, len(ordering))
+            }
+        }
+
+        return self._replace_urls(result, base_url)
+
+    @staticmethod
+    def _cached_response(snapshot: Snapshot, key: tuple, render: Callable[[], Any], pin: bool = False) -> Any:
+        with snapshot.cache_lock:
+            response = snapshot.warmed.get(key, _MISSING)
+            if response is _MISSING:
+                response = snapshot.responses.get(key, _MISSING)
+                if response is not _MISSING:
+                    snapshot.responses.move_to_end(key)
+                    if pin:
+                        snapshot.warmed[key] = snapshot.responses.pop(key)
+
+        if response is not _MISSING:
+            return response
+
+        response = render()
+        if response is None:
+            # Misses are cheap to recompute and would only crowd out real pages.
+            return response
+
+        with snapshot.cache_lock:
+            if pin:
+                snapshot.warmed[key] = response
+            else:
+                snapshot.responses[key] = response
+                while len(snapshot.responses) > RESPONSE_CACHE_SIZE:
+                    snapshot.responses.popitem(last=False)
+
+        return response
+
+    def _query_resource(
+            self,
+            query: ListQuery,
             page: int,
             size: int,
             base_url: str,
-            film_id: Optional[int] = None
+            snapshot: Optional[Snapshot] = None,
+            pin: bool = False
     ) -> Dict[str, Any]:
+        if query.match not in MATCH_MODES:
+            raise QueryValidationError(f'Match mode "{query.match}" not supported.')
+
+        snapshot = snapshot or self.get_snapshot()
 
-        if film_id:
-            target_suffix = f"/films/{film_id}/"
+        return self._cached_response(
+            snapshot,
+            ('list', query, page, size, base_url),
+            lambda: self._render_page(snapshot, query, page, size, base_url),
+            pin
+        )
 
-            data = [
-                item for item in data
-                if 'films' in item and any(url.endswith(target_suffix) for url in item.get('films', []))
-            ]
+    def _render_page(
+            self,
+            snapshot: Snapshot,
+            query: ListQuery,
+            page: int,
+            size: int,
+            base_url: str
+    ) -> Dict[str, Any]:
+        result = None
+
+        if self.query_backend == 'sqlite' and query.match == 'exact' and not query.field_filters:
+            query_result = snapshot.sqlite_engine.query(
+                query.resource_type, query.filter_term, query.sort_by, page, size, query.film_id
+            )
+            if query_result is not None:
+                items, total_items = query_result
+                result = self._page_result(items, total_items, page, size, base_url)
+
+        if result is None:
+            result = self._paginate(self._ordering(snapshot, query), page, size, base_url)
+
+        meta = result['meta']
+        meta['snapshot_version'] = snapshot.version
+        meta['next_cursor'] = self._next_cursor(
+            snapshot, query, meta['current_page'] * size, size, meta['total_items']
+        )
 
-        if filter_term:
-            data = [
-                item for item in data
-                if filter_term.lower() in item.get(filter_field, '').lower()
-            ]
+        return result
 
-        if sort_by and data:
-            if sort_by in data[0]:
+    def _default_hot_queries(self, snapshot: Snapshot) -> List[str]:
+        hot_queries = []
+
+        for resource_type in RESOURCE_TYPES:
+            hot_queries.append(resource_type)
+
+            for item in snapshot.items(resource_type)[:self.warmup_top_ids]:
+                key = parse_resource_url(item.get('url'))
+                if key:
+                    hot_queries.append(f"{resource_type}/{key[1]}")
+
+        return hot_queries
+
+    def _warm_query(self, snapshot: Snapshot, hot_query: str, base_url: str) -> None:
+        path, _, query_string = hot_query.partition('?')
+        segments = [segment for segment in path.strip('/').split('/') if segment]
+        args = dict(parse_qsl(query_string))
+
+        resource_type = canonical_resource_type(segments[0] if segments else args.get('type', 'people'))
+        if resource_type is None or len(segments) > 2:
+            raise ValueError(f'Hot query "{hot_query}" not supported.')
+
+        if len(segments) == 2:
+            self._render_resource(snapshot, resource_type, int(segments[1]), base_url, pin=True)
+            return
+
+        film_id = int(args['film_id']) if args.get('film_id') and resource_type != 'films' else None
+        query = ListQuery(
+            resource_type,
+            args.get('filter') or args.get('name'),
+            args.get('sort'),
+            film_id,
+            args.get('match', 'exact').lower(),
+            normalize_filters({field: [value] for field, value in args.items() if field in FILTERABLE_FIELDS})
+        )
+
+        self._query_resource(query, int(args.get('page', 1)), int(args.get('size', 10)), base_url, snapshot, pin=True)
+
+    def warmup(self, base_url: str = "", hot_queries: Optional[List[str]] = None) -> Dict[str, Any]:
+        snapshot = self.get_snapshot()
+        hot_queries = hot_queries or self.warmup_queries or self._default_hot_queries(snapshot)
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=WARMUP_WORKERS) as executor:
+            futures = {
+                executor.submit(self._warm_query, snapshot, hot_query, base_url): hot_query
+                for hot_query in hot_queries
+            }
+            for future, hot_query in futures.items():
                 try:
-                    data.sort(key=lambda x: x.get(sort_by, ""))
-                except TypeError:
-                    pass
+                    future.result()
+                except Exception as e:
+                    failed.append({"query": hot_query, "error": str(e)})
 
-        return self._paginate(data, page, size, base_url)
+        return {
+            "snapshot_version": snapshot.version,
+            "warmed": len(hot_queries) - len(failed),
+            "failed": failed
+        }
 
     def get_people(
             self,
@@ -118,11 +668,13 @@ class StarWarsService:
             page: int = 1,
             size: int = 10,
             base_url: str = "",
-            film_id: Optional[int] = None
+            film_id: Optional[int] = None,
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Person]:
-        return self._process_resource(
-            self.client.get_people(),
-            name_filter, 'name', sort_by, page, size, base_url, film_id
+        return self._query_resource(
+            ListQuery('people', name_filter, sort_by, film_id, match, normalize_filters(field_filters)),
+            page, size, base_url
         )
 
     def get_planets(
@@ -132,17 +684,13 @@ class StarWarsService:
             page: int = 1,
             size: int = 10,
             base_url: str = "",
-            film_id: Optional[int] = None
+            film_id: Optional[int] = None,
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Planet]:
-        return self._process_resource(
-            self.client.get_planets(),
-            name_filter,
-            'name',
-            sort_by,
-            page,
-            size,
-            base_url,
-            film_id
+        return self._query_resource(
+            ListQuery('planets', name_filter, sort_by, film_id, match, normalize_filters(field_filters)),
+            page, size, base_url
         )
 
     def get_starships(
@@ -152,17 +700,13 @@ class StarWarsService:
             page: int = 1,
             size: int = 10,
             base_url: str = "",
-            film_id: Optional[int] = None
+            film_id: Optional[int] = None,
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Starship]:
-        return self._process_resource(
-            self.client.get_starships(),
-            name_filter,
-            'name',
-            sort_by,
-            page,
-            size,
-            base_url,
-            film_id
+        return self._query_resource(
+            ListQuery('starships', name_filter, sort_by, film_id, match, normalize_filters(field_filters)),
+            page, size, base_url
         )
 
     def get_species(
@@ -172,17 +716,13 @@ class StarWarsService:
             page: int = 1,
             size: int = 10,
             base_url: str = "",
-            film_id: Optional[int] = None
+            film_id: Optional[int] = None,
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Specie]:
-        return self._process_resource(
-            self.client.get_species(),
-            name_filter,
-            'name',
-            sort_by,
-            page,
-            size,
-            base_url,
-            film_id
+        return self._query_resource(
+            ListQuery('species', name_filter, sort_by, film_id, match, normalize_filters(field_filters)),
+            page, size, base_url
         )
 
     def get_vehicles(
@@ -192,17 +732,13 @@ class StarWarsService:
             page: int = 1,
             size: int = 10,
             base_url: str = "",
-            film_id: Optional[int] = None
+            film_id: Optional[int] = None,
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Vehicle]:
-        return self._process_resource(
-            self.client.get_vehicles(),
-            name_filter,
-            'name',
-            sort_by,
-            page,
-            size,
-            base_url,
-            film_id
+        return self._query_resource(
+            ListQuery('vehicles', name_filter, sort_by, film_id, match, normalize_filters(field_filters)),
+            page, size, base_url
         )
 
     def get_films(
@@ -211,14 +747,11 @@ class StarWarsService:
             sort_by: Optional[str] = None,
             page: int = 1,
             size: int = 10,
-            base_url: str = ""
+            base_url: str = "",
+            match: str = 'exact',
+            field_filters: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Film]:
-        return self._process_resource(
-            self.client.get_films(),
-            title_filter,
-            'title',
-            sort_by,
-            page,
-            size,
-            base_url
+        return self._query_resource(
+            ListQuery('films', title_filter, sort_by, None, match, normalize_filters(field_filters)),
+            page, size, base_url
         )
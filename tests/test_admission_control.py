@@ -0,0 +1,53 @@
+import pytest
+
+from admission_control import AdmissionController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_token_bucket_allows_burst_then_limits(clock):
+    admission = AdmissionController(rate_per_second=0.5, burst=2, max_in_flight=1, clock=clock)
+
+    assert admission.check_rate("key:a") is None
+    assert admission.check_rate("key:a") is None
+    assert admission.check_rate("key:a") == 2
+
+
+def test_token_bucket_refills_over_time(clock):
+    admission = AdmissionController(rate_per_second=1, burst=1, max_in_flight=1, clock=clock)
+
+    assert admission.check_rate("key:a") is None
+    assert admission.check_rate("key:a") == 1
+
+    clock.now += 1
+    assert admission.check_rate("key:a") is None
+
+
+def test_buckets_are_per_client(clock):
+    admission = AdmissionController(rate_per_second=1, burst=1, max_in_flight=1, clock=clock)
+
+    assert admission.check_rate("key:a") is None
+    assert admission.check_rate("key:b") is None
+    assert admission.check_rate("key:a") is not None
+
+
+def test_in_flight_limit(clock):
+    admission = AdmissionController(rate_per_second=1, burst=1, max_in_flight=2, retry_after=3, clock=clock)
+
+    assert admission.try_enter() is None
+    assert admission.try_enter() is None
+    assert admission.try_enter() == 3
+
+    admission.leave()
+    assert admission.try_enter() is None
@@ -0,0 +1,54 @@
+import pytest
+
+from bitmap_index import BitmapIndex, bitmap_positions, normalize_filters
+
+DATA = {
+    "people": [
+        {"name": "Luke Skywalker", "gender": "male", "hair_color": "blond", "eye_color": "blue"},
+        {"name": "Leia Organa", "gender": "female", "hair_color": "brown", "eye_color": "brown"},
+        {"name": "Beru Whitesun lars", "gender": "female", "hair_color": "brown", "eye_color": "blue"},
+        {"name": "Anakin Skywalker", "gender": "male", "hair_color": "blond, brown", "eye_color": "blue"},
+        {"name": "R2-D2", "gender": "n/a", "hair_color": "n/a", "eye_color": "red"},
+    ],
+    "planets": [
+        {"name": "Tatooine", "climate": "arid", "terrain": "desert"},
+        {"name": "Naboo", "climate": "temperate", "terrain": "grassy hills, swamps, forests, mountains"},
+    ],
+}
+
+
+def positions(index, resource_type, filters):
+    return list(bitmap_positions(index.match(resource_type, normalize_filters(filters))))
+
+
+def test_single_field_equality():
+    assert positions(BitmapIndex(DATA), 'people', {"gender": ["female"]}) == [1, 2]
+
+
+def test_multi_value_fields_are_tokenized():
+    index = BitmapIndex(DATA)
+
+    assert positions(index, 'people', {"hair_color": ["brown"]}) == [1, 2, 3]
+    assert positions(index, 'planets', {"terrain": ["Swamps"]}) == [1]
+
+
+def test_values_are_ored_and_fields_are_anded():
+    index = BitmapIndex(DATA)
+
+    assert positions(index, 'people', {"gender": ["male,n/a"]}) == [0, 3, 4]
+    assert positions(index, 'people', {"gender": ["female", "male"], "eye_color": ["blue"]}) == [0, 2, 3]
+    assert positions(index, 'people', {"gender": ["male"], "hair_color": ["brown"]}) == [3]
+
+
+def test_unknown_value_matches_nothing():
+    assert positions(BitmapIndex(DATA), 'people', {"eye_color": ["purple"]}) == []
+
+
+def test_field_must_belong_to_resource_type():
+    with pytest.raises(ValueError):
+        positions(BitmapIndex(DATA), 'planets', {"gender": ["male"]})
+
+
+def test_normalize_filters_is_canonical():
+    assert normalize_filters({"gender": ["Male, female"], "eye_color": [" "]}) == (("gender", ("female", "male")),)
+    assert normalize_filters(None) == ()
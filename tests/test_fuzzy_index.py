@@ -0,0 +1,45 @@
+from fuzzy_index import FuzzyIndex
+
+DATA = {
+    "people": [
+        {"name": "Luke Skywalker"},
+        {"name": "Anakin Skywalker"},
+        {"name": "Darth Vader"},
+        {"name": "Shmi Skywalker"},
+    ],
+    "starships": [
+        {"name": "Millennium Falcon"},
+        {"name": "X-wing"},
+    ],
+    "films": [
+        {"title": "The Empire Strikes Back"},
+    ],
+}
+
+
+def test_tolerates_typos_inside_a_word():
+    index = FuzzyIndex(DATA)
+
+    assert index.search('starships', 'Millenium') == [0]
+    assert sorted(index.search('people', 'Skywaker')) == [0, 1, 3]
+
+
+def test_ranks_by_edit_distance():
+    index = FuzzyIndex(DATA)
+
+    assert index.search('people', 'darth vadr') == [2]
+    assert index.search('people', 'luke skywaker')[0] == 0
+
+
+def test_exact_substrings_rank_first():
+    index = FuzzyIndex({"people": [{"name": "Lobot"}, {"name": "Lobo"}]})
+
+    assert index.search('people', 'lobo') == [1, 0]
+
+
+def test_uses_film_titles():
+    assert FuzzyIndex(DATA).search('films', 'empyre') == [0]
+
+
+def test_rejects_distant_terms():
+    assert FuzzyIndex(DATA).search('people', 'chewbacca') == []
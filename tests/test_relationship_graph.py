@@ -0,0 +1,73 @@
+import pytest
+
+from relationship_graph import RelationshipGraph
+
+API = "https://swapi.dev/api"
+
+
+@pytest.fixture
+def graph():
+    return RelationshipGraph({
+        "people": [
+            {"name": "Luke Skywalker", "url": f"{API}/people/1/", "homeworld": f"{API}/planets/1/"},
+            {"name": "Han Solo", "url": f"{API}/people/14/", "homeworld": f"{API}/planets/22/"},
+            {"name": "Chewbacca", "url": f"{API}/people/13/", "homeworld": f"{API}/planets/14/"},
+            {"name": "Owen Lars", "url": f"{API}/people/6/", "homeworld": f"{API}/planets/1/"},
+        ],
+        "planets": [
+            {"name": "Tatooine", "url": f"{API}/planets/1/",
+             "residents": [f"{API}/people/1/", f"{API}/people/6/"]},
+            {"name": "Kashyyyk", "url": f"{API}/planets/14/", "residents": [f"{API}/people/13/"]},
+        ],
+        "starships": [
+            {"name": "Millennium Falcon", "url": f"{API}/starships/10/",
+             "pilots": [f"{API}/people/14/", f"{API}/people/13/"]},
+            {"name": "X-wing", "url": f"{API}/starships/12/", "pilots": [f"{API}/people/1/"]},
+        ],
+        "species": [
+            {"name": "Human", "url": f"{API}/species/1/", "homeworld": None,
+             "people": [f"{API}/people/1/", f"{API}/people/14/"]},
+        ],
+        "films": [
+            {"title": "The Empire Strikes Back", "url": f"{API}/films/2/",
+             "starships": [f"{API}/starships/10/", f"{API}/starships/12/"],
+             "characters": [f"{API}/people/1/", f"{API}/people/13/", f"{API}/people/14/"]},
+        ],
+    })
+
+
+def names(graph, nodes):
+    return [item.get('name') or item.get('title') for item in graph.items(nodes)]
+
+
+def test_multi_hop_traversal(graph):
+    film = graph.node_id('films', 2)
+
+    pilots = graph.traverse({film}, ['starships', 'pilots'])
+
+    assert names(graph, pilots) == ["Luke Skywalker", "Chewbacca", "Han Solo"]
+
+
+def test_traversal_follows_single_url_fields(graph):
+    human = graph.node_id('species', 1)
+
+    residents = graph.traverse({human}, ['people', 'homeworld', 'residents'])
+
+    assert names(graph, residents) == ["Luke Skywalker", "Owen Lars"]
+
+
+def test_traversal_ignores_unknown_targets(graph):
+    han = graph.node_id('people', 14)
+
+    assert graph.traverse({han}, ['homeworld']) == set()
+
+
+def test_traversal_rejects_unknown_relation(graph):
+    with pytest.raises(ValueError):
+        graph.traverse({0}, ['midichlorians'])
+
+
+def test_node_ids_are_dense_integers(graph):
+    assert len(graph) == 10
+    assert graph.node_id('people', 1) == 0
+    assert graph.node_id('people', 999) is None
@@ -0,0 +1,55 @@
+from search_index import SearchIndex
+
+
+def build_index():
+    return SearchIndex({
+        "people": [
+            {"name": "Luke Skywalker", "url": "https://swapi.dev/api/people/1/"},
+            {"name": "Anakin Skywalker", "url": "https://swapi.dev/api/people/11/"},
+        ],
+        "starships": [
+            {"name": "Millennium Falcon", "url": "https://swapi.dev/api/starships/10/"},
+        ],
+        "films": [
+            {"title": "The Empire Strikes Back", "url": "https://swapi.dev/api/films/2/"},
+        ],
+    })
+
+
+def test_search_matches_inside_words():
+    hits = build_index().search("walker")
+
+    assert [hit['name'] for hit in hits] == ["Anakin Skywalker", "Luke Skywalker"]
+
+
+def test_search_indexes_film_titles():
+    hits = build_index().search("EMPIRE")
+
+    assert hits == [{
+        "type": "films",
+        "id": 2,
+        "name": "The Empire Strikes Back",
+        "url": "https://swapi.dev/api/films/2/"
+    }]
+
+
+def test_search_requires_every_token():
+    index = build_index()
+
+    assert [hit['id'] for hit in index.search("luke sky")] == [1]
+    assert index.search("luke falcon") == []
+
+
+def test_search_exact_name_ranks_first():
+    index = SearchIndex({
+        "people": [
+            {"name": "Darth Vader", "url": "https://swapi.dev/api/people/4/"},
+            {"name": "Vader", "url": "https://swapi.dev/api/people/99/"},
+        ],
+    })
+
+    assert [hit['id'] for hit in index.search("vader")] == [99, 4]
+
+
+def test_search_blank_query():
+    assert build_index().search("   ") == []
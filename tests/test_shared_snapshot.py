@@ -0,0 +1,119 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared_snapshot import RecordList, SharedSnapshotStore
+from snapshot import data_digest
+
+DATA = {"people": [{"name": "Luke Skywalker", "url": "https://swapi.dev/api/people/1/"}]}
+
+
+def decoded(shared):
+    return {resource_type: list(items) for resource_type, items in shared.data.items()}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "starwars-snapshot")
+
+
+def test_first_load_publishes_snapshot(path):
+    loader = MagicMock(return_value=DATA)
+
+    shared = SharedSnapshotStore(path, ttl=60).load(loader)
+
+    assert shared.version == 1
+    assert decoded(shared) == DATA
+    loader.assert_called_once()
+
+
+def test_other_workers_attach_without_crawling(path):
+    SharedSnapshotStore(path, ttl=60).load(lambda: DATA)
+    loader = MagicMock(return_value=DATA)
+
+    shared = SharedSnapshotStore(path, ttl=60).load(loader)
+
+    assert shared.version == 1
+    assert decoded(shared) == DATA
+    loader.assert_not_called()
+
+
+def test_known_version_skips_decoding(path):
+    store = SharedSnapshotStore(path, ttl=60)
+    store.load(lambda: DATA)
+
+    shared = store.load(lambda: DATA, known_version=1)
+
+    assert shared.version == 1
+    assert shared.data is None
+
+
+def test_stale_snapshot_is_recrawled(path):
+    SharedSnapshotStore(path, ttl=60).load(lambda: DATA)
+    loader = MagicMock(return_value={"people": []})
+
+    shared = SharedSnapshotStore(path, ttl=-1).load(loader)
+
+    assert shared.version == 2
+    assert decoded(shared) == {"people": []}
+    loader.assert_called_once()
+
+
+def test_force_recrawls_fresh_snapshot(path):
+    store = SharedSnapshotStore(path, ttl=60)
+    store.load(lambda: DATA)
+    loader = MagicMock(return_value=DATA)
+
+    shared = store.load(loader, known_version=1, force=True)
+
+    assert shared.version == 2
+    loader.assert_called_once()
+
+
+def test_stale_worker_does_not_wait_for_running_crawl(path):
+    import fcntl
+
+    store = SharedSnapshotStore(path, ttl=-1)
+    store.load(lambda: DATA)
+    loader = MagicMock(return_value=DATA)
+
+    with open(store.lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        assert SharedSnapshotStore(path, ttl=-1).load(loader, known_version=1) is None
+
+    loader.assert_not_called()
+
+
+def test_corrupt_file_is_replaced(path):
+    with open(path, 'wb') as f:
+        f.write(b'garbage')
+
+    shared = SharedSnapshotStore(path, ttl=60).load(lambda: DATA)
+
+    assert decoded(shared) == DATA
+
+
+def test_items_are_mapped_records_decoded_on_access(path):
+    data = {"people": DATA["people"] + [{"name": "Leia Organa"}], "films": []}
+
+    shared = SharedSnapshotStore(path, ttl=60).load(lambda: data)
+    people = shared.data["people"]
+
+    assert isinstance(people, RecordList)
+    assert len(people) == 2 and len(shared.data["films"]) == 0
+    assert people[-1] == {"name": "Leia Organa"}
+    assert people[0:1] == DATA["people"]
+    assert people[0] is not people[0]
+    assert shared.digest == data_digest(data)
+
+
+def test_truncated_file_is_replaced(path):
+    SharedSnapshotStore(path, ttl=60).load(lambda: DATA)
+    with open(path, 'r+b') as f:
+        f.truncate(f.seek(0, 2) - 5)
+
+    loader = MagicMock(return_value=DATA)
+    shared = SharedSnapshotStore(path, ttl=60).load(loader)
+
+    assert decoded(shared) == DATA
+    loader.assert_called_once()
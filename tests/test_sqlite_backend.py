@@ -0,0 +1,150 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from sqlite_backend import SQLiteQueryEngine
+from starwars_service import StarWarsService
+
+API = "https://swapi.dev/api"
+
+DATA = {
+    "people": [
+        {"name": "Leia Organa", "height": "150", "url": f"{API}/people/5/", "films": [f"{API}/films/1/"]},
+        {"name": "Luke Skywalker", "height": "172", "url": f"{API}/people/1/",
+         "films": [f"{API}/films/1/", f"{API}/films/2/"]},
+        {"name": "Darth Vader", "height": "202", "url": f"{API}/people/4/", "films": [f"{API}/films/2/"]},
+        {"name": "Han Solo", "height": "180", "url": f"{API}/people/14/", "films": [f"{API}/films/1/"]},
+        {"name": "Anakin Skywalker", "url": f"{API}/people/11/", "films": []},
+    ],
+    "films": [
+        {"title": "The Empire Strikes Back", "episode_id": 5, "url": f"{API}/films/2/"},
+        {"title": "A New Hope", "episode_id": 4, "url": f"{API}/films/1/"},
+    ],
+}
+
+
+@pytest.fixture
+def engine():
+    return SQLiteQueryEngine(DATA)
+
+
+def names(items):
+    return [item.get('name') or item.get('title') for item in items]
+
+
+def test_filter_is_case_insensitive_substring(engine):
+    items, total = engine.query('people', 'SKYWALK', None, 1, 10)
+
+    assert names(items) == ["Luke Skywalker", "Anakin Skywalker"]
+    assert total == 2
+
+
+def test_short_filter_terms(engine):
+    items, _ = engine.query('people', 'h', None, 1, 10)
+
+    assert names(items) == ["Darth Vader", "Han Solo"]
+
+
+def test_film_join_and_sort(engine):
+    items, total = engine.query('people', None, 'name', 1, 10, film_id=1)
+
+    assert names(items) == ["Han Solo", "Leia Organa", "Luke Skywalker"]
+    assert total == 3
+
+
+def test_sort_by_integer_field(engine):
+    items, _ = engine.query('films', None, 'episode_id', 1, 10)
+
+    assert names(items) == ["A New Hope", "The Empire Strikes Back"]
+
+
+def test_limit_offset_pagination(engine):
+    items, total = engine.query('people', None, 'name', 2, 2)
+
+    assert names(items) == ["Han Solo", "Leia Organa"]
+    assert total == 5
+
+
+def test_unsupported_sort_is_left_to_caller(engine):
+    assert engine.query('people', None, 'films', 1, 10) is None
+    assert engine.query('people', None, 'midichlorians', 1, 10) is None
+
+
+@pytest.mark.parametrize("filter_term, sort_by, film_id", [
+    (None, 'name', None),
+    ('skywalker', 'height', None),
+    (None, 'name', 1),
+    ('sky', None, 2),
+])
+def test_queries_are_index_driven(engine, filter_term, sort_by, film_id):
+    plan = engine.query_plan('people', filter_term, sort_by, film_id)
+
+    assert not any("TEMP B-TREE" in step for step in plan)
+    assert not any(step in ("SCAN i", "SCAN f") for step in plan)
+    if sort_by:
+        assert any("item_fields_sort" in step for step in plan)
+
+
+@pytest.mark.parametrize("method, kwargs", [
+    ("get_people", {}),
+    ("get_people", {"sort_by": "height"}),
+    ("get_people", {"sort_by": "name", "page": 2, "size": 2}),
+    ("get_people", {"name_filter": "a", "sort_by": "name"}),
+    ("get_people", {"film_id": 2}),
+    ("get_people", {"sort_by": "films"}),
+    ("get_people", {"name_filter": "Spock"}),
+    ("get_films", {"sort_by": "title"}),
+    ("get_films", {"title_filter": "hope"}),
+])
+def test_sqlite_backend_matches_memory_backend(method, kwargs):
+    client = MagicMock()
+    client.get_people.return_value = DATA["people"]
+    client.get_films.return_value = DATA["films"]
+    for resource in ("planets", "starships", "species", "vehicles"):
+        getattr(client, f"get_{resource}").return_value = []
+
+    memory = StarWarsService(client=client)
+    sqlite = StarWarsService(client=client, query_backend='sqlite')
+
+    expected = getattr(memory, method)(base_url="http://localhost", **kwargs)
+
+    assert getattr(sqlite, method)(base_url="http://localhost", **kwargs) == expected
+
+
+def test_unknown_query_backend():
+    with pytest.raises(ValueError):
+        StarWarsService(client=MagicMock(), query_backend='postgres')
+
+
+def test_engine_is_built_once_per_snapshot_under_concurrency(mocker):
+    import threading
+    import time
+    from snapshot import Snapshot
+
+    def slow_engine(data):
+        time.sleep(0.05)
+        return MagicMock()
+
+    build = mocker.patch('snapshot.SQLiteQueryEngine', side_effect=slow_engine)
+    snapshot = Snapshot(1, DATA)
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(snapshot.sqlite_engine)) for _ in range(6)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    build.assert_called_once_with(DATA)
+    assert all(engine is engines[0] for engine in engines)
+
+
+def test_totals_cache_is_bounded_and_case_insensitive(engine, mocker):
+    mocker.patch('sqlite_backend.TOTALS_CACHE_SIZE', 2)
+
+    engine.query('people', 'Sky', None, 1, 2)
+    engine.query('people', 'SKY', None, 2, 2)
+    engine.query('people', 'solo', None, 1, 2)
+    engine.query('people', 'vader', None, 1, 2)
+
+    assert list(engine._totals) == [('people', 'solo', None), ('people', 'vader', None)]
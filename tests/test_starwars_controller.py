@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock
 from flask import Flask
+from cursor import CursorExpiredError
+from errors import QueryValidationError, SnapshotBusyError
 from starwars_controller import StarWarsController
 
 app = Flask(__name__)
@@ -154,3 +156,320 @@ def test_get_by_id_routing(controller, mock_service):
 
         assert status == 200
         mock_service.get_resource_by_id.assert_called_with('people', 1, 'http://localhost')
+
+
+def test_search_routing(controller, mock_service):
+    mock_service.search.return_value = {"data": [], "meta": {}}
+
+    with app.test_request_context('/search?q=falcon&size=5'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        mock_service.search.assert_called_with('falcon', 1, 5, base_url='http://localhost')
+
+
+def test_search_requires_query(controller, mock_service):
+    with app.test_request_context('/search'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        mock_service.search.assert_not_called()
+
+
+def test_related_routing(controller, mock_service):
+    mock_service.get_related.return_value = {"data": [], "meta": {}}
+
+    with app.test_request_context('/films/2/related?path=starships.pilots&path=characters'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        mock_service.get_related.assert_called_with(
+            'films', 2, [['starships', 'pilots'], ['characters']], 1, 10, base_url='http://localhost'
+        )
+
+
+def test_related_unknown_relation(controller, mock_service):
+    mock_service.get_related.side_effect = ValueError('Unknown relation "midichlorians"')
+
+    with app.test_request_context('/films/2/related?path=midichlorians'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        assert 'midichlorians' in response.json['error']
+
+
+def test_related_requires_path(controller, mock_service):
+    with app.test_request_context('/films/2/related'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        mock_service.get_related.assert_not_called()
+
+
+def test_export_streams_response(controller, mock_service):
+    mock_service.export_resource.return_value = iter(['{"name": "Luke"}\n', '{"name": "Leia"}\n'])
+
+    with app.test_request_context('/export/people?format=ndjson&fields=name,%20height&filter=l'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        assert response.get_data(as_text=True) == '{"name": "Luke"}\n{"name": "Leia"}\n'
+        mock_service.export_resource.assert_called_with(
+            'people', 'l', None, ['name', 'height'], 'ndjson', base_url='http://localhost', film_id=None
+        )
+
+
+def test_export_passes_field_filters_and_match(controller, mock_service):
+    mock_service.export_resource.return_value = iter([])
+
+    with app.test_request_context('/export/people?gender=female&match=fuzzy&filter=leya'):
+        from flask import request
+
+        _, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        mock_service.export_resource.assert_called_with(
+            'people', 'leya', None, None, 'ndjson', base_url='http://localhost', film_id=None,
+            match='fuzzy', field_filters={'gender': ['female']}
+        )
+
+
+def test_export_unknown_format(controller, mock_service):
+    with app.test_request_context('/export/people?format=xml'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        mock_service.export_resource.assert_not_called()
+
+
+def test_cursor_routing(controller, mock_service):
+    mock_service.get_page_by_cursor.return_value = {"data": [], "meta": {}}
+
+    with app.test_request_context('/people?cursor=abc'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        mock_service.get_page_by_cursor.assert_called_with('people', 'abc', base_url='http://localhost')
+        mock_service.get_people.assert_not_called()
+
+
+@pytest.mark.parametrize("error, expected_status", [
+    (ValueError('Invalid cursor'), 400),
+    (CursorExpiredError('expired'), 410),
+    (SnapshotBusyError('busy'), 503),
+])
+def test_cursor_errors(controller, mock_service, error, expected_status):
+    mock_service.get_page_by_cursor.side_effect = error
+
+    with app.test_request_context('/people?cursor=abc'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == expected_status
+
+
+def test_fuzzy_match_routing(controller, mock_service):
+    with app.test_request_context('/people?filter=Skywaker&match=fuzzy'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        mock_service.get_people.assert_called_with(
+            'Skywaker', None, 1, 10, base_url='http://localhost', film_id=None, match='fuzzy'
+        )
+
+
+def test_unknown_match_mode(controller, mock_service):
+    with app.test_request_context('/people?filter=luke&match=regex'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        mock_service.get_people.assert_not_called()
+
+
+@pytest.mark.parametrize("url", [
+    '/people/1?match=regex&gender=droid',
+    '/search?q=luke&match=regex',
+    '/people/1/related?path=films&match=regex',
+])
+def test_match_and_field_filters_are_ignored_outside_listings(controller, mock_service, url):
+    mock_service.get_resource_by_id.return_value = {"name": "Luke"}
+    mock_service.search.return_value = {"data": []}
+    mock_service.get_related.return_value = {"data": []}
+
+    with app.test_request_context(url):
+        from flask import request
+
+        _, status, _ = controller.handle_request(request)
+
+        assert status == 200
+
+
+@pytest.mark.parametrize("url", [
+    '/export/people?match=regex',
+    '/people?cursor=abc&match=regex',
+])
+def test_unknown_match_mode_on_export_and_cursor(controller, mock_service, url):
+    with app.test_request_context(url):
+        from flask import request
+
+        _, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        mock_service.export_resource.assert_not_called()
+        mock_service.get_page_by_cursor.assert_not_called()
+
+
+def test_field_filter_routing(controller, mock_service):
+    with app.test_request_context('/people?gender=female&eye_color=blue&eye_color=brown'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        mock_service.get_people.assert_called_with(
+            None, None, 1, 10, base_url='http://localhost', film_id=None,
+            field_filters={'gender': ['female'], 'eye_color': ['blue', 'brown']}
+        )
+
+
+def test_service_validation_errors_are_bad_requests(controller, mock_service):
+    mock_service.get_planets.side_effect = QueryValidationError('Field "gender" cannot be filtered for planets.')
+
+    with app.test_request_context('/planets?gender=male'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 400
+        assert 'gender' in response.json['error']
+
+
+def test_upstream_value_errors_are_server_errors(controller, mock_service):
+    from json import JSONDecodeError
+
+    mock_service.get_people.side_effect = JSONDecodeError('Expecting value', '<html>', 0)
+
+    with app.test_request_context('/people'):
+        from flask import request
+
+        _, status, _ = controller.handle_request(request)
+
+        assert status == 500
+
+
+@pytest.fixture
+def admission():
+    from admission_control import AdmissionController
+
+    return AdmissionController(rate_per_second=0.1, burst=1, max_in_flight=1, retry_after=2)
+
+
+def test_cold_requests_are_rate_limited_per_key(mock_service, admission):
+    mock_service.needs_load.return_value = True
+    controller = StarWarsController(mock_service, admission)
+
+    with app.test_request_context('/people?key=abc'):
+        from flask import request
+
+        assert controller.handle_request(request)[1] == 200
+        response, status, headers = controller.handle_request(request)
+
+        assert status == 429
+        assert headers['Retry-After'] == '10'
+
+    with app.test_request_context('/people?key=other'):
+        from flask import request
+
+        assert controller.handle_request(request)[1] == 200
+
+
+def test_cold_requests_are_shed_when_saturated(mock_service, admission):
+    mock_service.needs_load.return_value = True
+    controller = StarWarsController(mock_service, admission)
+    admission.try_enter()
+
+    with app.test_request_context('/people?key=abc'):
+        from flask import request
+
+        response, status, headers = controller.handle_request(request)
+
+        assert status == 503
+        assert headers['Retry-After'] == '2'
+        mock_service.get_people.assert_not_called()
+
+
+def test_requests_served_from_snapshot_bypass_admission(mock_service, admission):
+    mock_service.needs_load.return_value = False
+    controller = StarWarsController(mock_service, admission)
+    admission.try_enter()
+
+    with app.test_request_context('/people?key=abc'):
+        from flask import request
+
+        for _ in range(3):
+            assert controller.handle_request(request)[1] == 200
+
+
+def test_in_flight_slot_is_released(mock_service, admission):
+    mock_service.needs_load.return_value = True
+    mock_service.get_people.side_effect = Exception("Critical Failure")
+    controller = StarWarsController(mock_service, admission)
+
+    with app.test_request_context('/people'):
+        from flask import request
+
+        assert controller.handle_request(request)[1] == 500
+
+    assert admission.try_enter() is None
+
+
+@pytest.mark.parametrize("trusted_proxies, forwarded_for, expected", [
+    (0, "6.6.6.6", "ip:10.0.0.1"),
+    (1, "6.6.6.6, 203.0.113.7", "ip:203.0.113.7"),
+    (2, "6.6.6.6, 203.0.113.7, 10.1.1.1", "ip:203.0.113.7"),
+    (2, "203.0.113.7", "ip:10.0.0.1"),
+])
+def test_client_key_ignores_spoofed_forwarded_for(mock_service, trusted_proxies, forwarded_for, expected):
+    controller = StarWarsController(mock_service, trusted_proxies=trusted_proxies)
+
+    with app.test_request_context('/people', headers={'X-Forwarded-For': forwarded_for},
+                                  environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        from flask import request
+
+        assert controller._client_key(request) == expected
+
+
+def test_warmup_routing(controller, mock_service):
+    mock_service.warmup.return_value = {"snapshot_version": 1, "warmed": 12, "failed": []}
+
+    with app.test_request_context('/_warmup'):
+        from flask import request
+
+        response, status, _ = controller.handle_request(request)
+
+        assert status == 200
+        assert response.json['warmed'] == 12
+        mock_service.warmup.assert_called_with(base_url='http://localhost')
@@ -8,38 +8,38 @@ def mock_client():
     client = MagicMock()
 
     client.get_people.return_value = [
-        {"name": "Leia Organa", "height": "150"},
-        {"name": "Luke Skywalker", "height": "172"},
-        {"name": "Darth Vader", "height": "202"},
-        {"name": "Han Solo", "height": "180"}
+        {"name": "Leia Organa", "height": "150", "url": "https://swapi.dev/api/people/5/"},
+        {"name": "Luke Skywalker", "height": "172", "url": "https://swapi.dev/api/people/1/"},
+        {"name": "Darth Vader", "height": "202", "url": "https://swapi.dev/api/people/4/"},
+        {"name": "Han Solo", "height": "180", "url": "https://swapi.dev/api/people/14/"}
     ]
 
     client.get_films.return_value = [
-        {"title": "A New Hope", "episode_id": 4},
-        {"title": "The Empire Strikes Back", "episode_id": 5},
-        {"title": "Return of the Jedi", "episode_id": 6}
+        {"title": "A New Hope", "episode_id": 4, "url": "https://swapi.dev/api/films/1/"},
+        {"title": "The Empire Strikes Back", "episode_id": 5, "url": "https://swapi.dev/api/films/2/"},
+        {"title": "Return of the Jedi", "episode_id": 6, "url": "https://swapi.dev/api/films/3/"}
     ]
 
     client.get_planets.return_value = [
-        {"name": "Tatooine", "climate": "arid"},
-        {"name": "Alderaan", "climate": "temperate"},
-        {"name": "Hoth", "climate": "frozen"}
+        {"name": "Tatooine", "climate": "arid", "url": "https://swapi.dev/api/planets/1/"},
+        {"name": "Alderaan", "climate": "temperate", "url": "https://swapi.dev/api/planets/2/"},
+        {"name": "Hoth", "climate": "frozen", "url": "https://swapi.dev/api/planets/4/"}
     ]
 
     client.get_starships.return_value = [
-        {"name": "X-wing", "model": "T-65 X-wing"},
-        {"name": "Millennium Falcon", "model": "YT-1300 light freighter"}
+        {"name": "X-wing", "model": "T-65 X-wing", "url": "https://swapi.dev/api/starships/12/"},
+        {"name": "Millennium Falcon", "model": "YT-1300 light freighter", "url": "https://swapi.dev/api/starships/10/"}
     ]
 
     client.get_species.return_value = [
-        {"name": "Human", "classification": "mammal"},
-        {"name": "Droid", "classification": "artificial"},
-        {"name": "Wookiee", "classification": "mammal"}
+        {"name": "Human", "classification": "mammal", "url": "https://swapi.dev/api/species/1/"},
+        {"name": "Droid", "classification": "artificial", "url": "https://swapi.dev/api/species/2/"},
+        {"name": "Wookiee", "classification": "mammal", "url": "https://swapi.dev/api/species/3/"}
     ]
 
     client.get_vehicles.return_value = [
-        {"name": "Snowspeeder", "model": "t-47 airspeeder"},
-        {"name": "Imperial Speeder Bike", "model": "74-Z speeder bike"}
+        {"name": "Snowspeeder", "model": "t-47 airspeeder", "url": "https://swapi.dev/api/vehicles/14/"},
+        {"name": "Imperial Speeder Bike", "model": "74-Z speeder bike", "url": "https://swapi.dev/api/vehicles/30/"}
     ]
 
     return client
@@ -128,3 +128,462 @@ def test_empty_search_result(service):
     assert len(response['data']) == 0
     assert response['meta']['total_items'] == 0
     assert response['meta']['total_pages'] == 0
+
+
+def test_get_resource_by_id(service):
+    item = service.get_resource_by_id('person', 4, 'http://localhost')
+
+    assert item['name'] == "Darth Vader"
+    assert item['url'] == "http://localhost/people/4/"
+
+
+def test_get_resource_by_id_not_found(service):
+    assert service.get_resource_by_id('people', 99, 'http://localhost') is None
+    assert service.get_resource_by_id('wookies', 1, 'http://localhost') is None
+
+
+def test_snapshot_is_reused_between_requests(service, mock_client):
+    service.get_people()
+    service.get_planets()
+    service.get_resource_by_id('films', 1, '')
+
+    assert mock_client.get_people.call_count == 1
+    assert mock_client.get_films.call_count == 1
+
+
+def test_refresh_snapshot_bumps_version(service, mock_client):
+    first = service.get_snapshot()
+    second = service.refresh_snapshot()
+
+    assert second.version == first.version + 1
+    assert mock_client.get_people.call_count == 2
+
+
+def test_sort_does_not_mutate_snapshot(service):
+    service.get_people(sort_by="name")
+
+    assert service.get_snapshot().items('people')[0]['name'] == "Leia Organa"
+
+
+def test_search_across_resource_types(service):
+    response = service.search("falcon", base_url="http://localhost")
+    hits = response['data']
+
+    assert len(hits) == 1
+    assert hits[0] == {
+        "type": "starships",
+        "id": 10,
+        "name": "Millennium Falcon",
+        "url": "http://localhost/starships/10/"
+    }
+
+
+def test_search_ranks_prefix_matches_first(service):
+    response = service.search("s")
+    names = [hit['name'] for hit in response['data']]
+
+    assert names[0] == "Snowspeeder"
+    assert "Han Solo" in names
+    assert response['meta']['total_items'] == len(names)
+
+
+def test_get_related_intersects_paths(mock_client):
+    mock_client.get_films.return_value = [
+        {"title": "A New Hope", "url": "https://swapi.dev/api/films/1/",
+         "characters": ["https://swapi.dev/api/people/1/", "https://swapi.dev/api/people/5/"],
+         "starships": ["https://swapi.dev/api/starships/12/"]},
+    ]
+    mock_client.get_starships.return_value = [
+        {"name": "X-wing", "url": "https://swapi.dev/api/starships/12/",
+         "pilots": ["https://swapi.dev/api/people/1/", "https://swapi.dev/api/people/4/"]},
+    ]
+    service = StarWarsService(client=mock_client)
+
+    response = service.get_related('film', 1, [['starships', 'pilots'], ['characters']],
+                                   base_url="http://localhost")
+
+    assert [item['name'] for item in response['data']] == ["Luke Skywalker"]
+    assert response['data'][0]['url'] == "http://localhost/people/1/"
+
+
+def test_get_related_unknown_start(service):
+    assert service.get_related('films', 99, [['characters']]) is None
+
+
+def test_services_share_one_crawl_through_store(mock_client, tmp_path):
+    from shared_snapshot import SharedSnapshotStore
+
+    path = str(tmp_path / "starwars-snapshot")
+    first = StarWarsService(client=mock_client, snapshot_store=SharedSnapshotStore(path, ttl=60))
+    other_client = MagicMock()
+    second = StarWarsService(client=other_client, snapshot_store=SharedSnapshotStore(path, ttl=60))
+
+    first.get_people()
+    response = second.get_people(name_filter="skywalker")
+
+    assert response['data'][0]['name'] == "Luke Skywalker"
+    assert mock_client.get_people.call_count == 1
+    other_client.get_people.assert_not_called()
+    assert second.get_snapshot().version == first.get_snapshot().version
+
+
+def test_store_backed_snapshot_serves_mapped_records(mock_client, tmp_path):
+    from shared_snapshot import RecordList, SharedSnapshotStore
+
+    mapped = StarWarsService(client=mock_client, snapshot_store=SharedSnapshotStore(str(tmp_path / "s"), ttl=60))
+    memory = StarWarsService(client=mock_client)
+
+    assert isinstance(mapped.get_snapshot().items('people'), RecordList)
+    assert mapped.get_snapshot().digest == memory.get_snapshot().digest
+    assert mapped.get_people(sort_by="height") == memory.get_people(sort_by="height")
+    assert mapped.get_people(name_filter="sky", match='fuzzy') == memory.get_people(name_filter="sky", match='fuzzy')
+    assert mapped.get_resource_by_id('people', 4, "") == memory.get_resource_by_id('people', 4, "")
+    assert list(mapped.export_resource('planets', sort_by="name")) == list(memory.export_resource('planets', sort_by="name"))
+
+
+def test_export_ndjson_streams_filtered_sorted_items(service):
+    rows = service.export_resource('people', sort_by="name", fields=["name", "url"], base_url="http://localhost")
+
+    assert next(rows) == '{"name": "Darth Vader", "url": "http://localhost/people/4/"}\n'
+    assert len(list(rows)) == 3
+
+
+def test_export_csv_with_header_and_lists(service, mock_client):
+    mock_client.get_starships.return_value = [
+        {"name": "X-wing", "pilots": ["https://swapi.dev/api/people/1/", "https://swapi.dev/api/people/9/"]},
+    ]
+
+    rows = list(service.export_resource('starship', fields=["name", "pilots"], export_format='csv'))
+
+    assert rows == [
+        "name,pilots\r\n",
+        "X-wing,https://swapi.dev/api/people/1/ https://swapi.dev/api/people/9/\r\n"
+    ]
+
+
+def test_export_csv_defaults_columns_to_item_keys(service):
+    rows = list(service.export_resource('planets', filter_term="hoth", export_format='csv'))
+
+    assert rows == ["name,climate,url\r\n", "Hoth,frozen,https://swapi.dev/api/planets/4/\r\n"]
+
+
+def test_export_rejects_unknown_format(service):
+    with pytest.raises(ValueError):
+        service.export_resource('people', export_format='xml')
+
+    assert service.export_resource('wookies') is None
+
+
+def test_listing_meta_includes_next_cursor(service):
+    response = service.get_people(sort_by="name", size=3)
+
+    assert response['meta']['snapshot_version'] == 1
+    assert response['meta']['next_cursor']
+    assert service.get_people(sort_by="name", size=4)['meta']['next_cursor'] is None
+
+
+def test_cursor_walks_whole_collection(service):
+    response = service.get_people(sort_by="name", size=1)
+    names = [item['name'] for item in response['data']]
+
+    while response['meta']['next_cursor']:
+        response = service.get_page_by_cursor('people', response['meta']['next_cursor'])
+        names.extend(item['name'] for item in response['data'])
+
+    assert names == ["Darth Vader", "Han Solo", "Leia Organa", "Luke Skywalker"]
+
+
+def test_cursor_is_pinned_to_snapshot_version(service, mock_client):
+    cursor = service.get_people(sort_by="name", size=2)['meta']['next_cursor']
+
+    mock_client.get_people.return_value = [{"name": "Yoda", "url": "https://swapi.dev/api/people/20/"}]
+    service.refresh_snapshot()
+
+    response = service.get_page_by_cursor('person', cursor, base_url="http://localhost")
+
+    assert [item['name'] for item in response['data']] == ["Leia Organa", "Luke Skywalker"]
+    assert response['meta']['snapshot_version'] == 1
+    assert response['data'][0]['url'] == "http://localhost/people/5/"
+
+
+def test_cursor_expires_with_evicted_snapshot(mock_client):
+    from cursor import CursorExpiredError
+
+    service = StarWarsService(client=mock_client, snapshot_retention=1)
+    cursor = service.get_people(size=1)['meta']['next_cursor']
+    mock_client.get_people.return_value = [{"name": "Yoda", "url": "https://swapi.dev/api/people/20/"}]
+    service.refresh_snapshot()
+
+    with pytest.raises(CursorExpiredError):
+        service.get_page_by_cursor('people', cursor)
+
+
+def test_cursor_walks_across_service_instances(mock_client):
+    minting = StarWarsService(client=mock_client)
+    minting.refresh_snapshot()
+    minting.refresh_snapshot()
+    cursor = minting.get_people(sort_by="name", size=2)['meta']['next_cursor']
+
+    other = StarWarsService(client=mock_client)
+    response = other.get_page_by_cursor('people', cursor)
+
+    assert other.get_snapshot().version != minting.get_snapshot().version
+    assert [item['name'] for item in response['data']] == ["Leia Organa", "Luke Skywalker"]
+    assert response['meta']['next_cursor'] is None
+
+
+def test_cursor_from_a_different_crawl_expires(mock_client):
+    from cursor import CursorExpiredError
+
+    cursor = StarWarsService(client=mock_client).get_people(size=1)['meta']['next_cursor']
+    other_client = MagicMock()
+    for resource_type in ("people", "planets", "starships", "species", "vehicles", "films"):
+        getattr(other_client, f"get_{resource_type}").return_value = []
+
+    with pytest.raises(CursorExpiredError):
+        StarWarsService(client=other_client).get_page_by_cursor('people', cursor)
+
+
+def test_cursor_catch_up_does_not_wait_for_a_reload(mock_client, tmp_path):
+    from errors import SnapshotBusyError
+    from shared_snapshot import SharedSnapshotStore
+
+    path = str(tmp_path / "starwars-snapshot")
+    stale = StarWarsService(client=mock_client, snapshot_store=SharedSnapshotStore(path, ttl=60))
+    stale.get_people()
+    mock_client.get_people.return_value = [{"name": "Yoda", "url": "https://swapi.dev/api/people/20/"}] * 2
+    fresh = StarWarsService(client=mock_client, snapshot_store=SharedSnapshotStore(path, ttl=60))
+    fresh.refresh_snapshot()
+    cursor = fresh.get_people(size=1)['meta']['next_cursor']
+
+    with stale._snapshot_lock:
+        with pytest.raises(SnapshotBusyError):
+            stale.get_page_by_cursor('people', cursor)
+
+
+def test_cursor_from_newer_worker_reloads_shared_snapshot(mock_client, tmp_path):
+    from shared_snapshot import SharedSnapshotStore
+
+    path = str(tmp_path / "starwars-snapshot")
+    stale = StarWarsService(client=mock_client, snapshot_store=SharedSnapshotStore(path, ttl=60))
+    fresh = StarWarsService(client=mock_client, snapshot_store=SharedSnapshotStore(path, ttl=60))
+    stale.get_people()
+
+    mock_client.get_people.return_value = [
+        {"name": "Yoda", "url": "https://swapi.dev/api/people/20/"},
+        {"name": "Rey", "url": "https://swapi.dev/api/people/85/"},
+    ]
+    fresh.refresh_snapshot()
+    cursor = fresh.get_people(size=1)['meta']['next_cursor']
+
+    response = stale.get_page_by_cursor('people', cursor)
+
+    assert [item['name'] for item in response['data']] == ["Rey"]
+    assert response['meta']['snapshot_version'] == 2
+
+
+def test_ordering_cache_keeps_recently_used_queries(service, mocker):
+    mocker.patch('starwars_service.ORDERING_CACHE_SIZE', 2)
+
+    service.get_people(sort_by="name")
+    service.get_people(sort_by="height")
+    service.get_people(sort_by="name", page=2, size=2)
+    service.get_people(name_filter="sky")
+
+    keys = [query.sort_by for query in service.get_snapshot().orderings]
+    assert keys == ["name", None]
+
+
+def test_cursor_validation(service):
+    cursor = service.get_people(size=1)['meta']['next_cursor']
+
+    with pytest.raises(ValueError):
+        service.get_page_by_cursor('planets', cursor)
+
+    with pytest.raises(ValueError):
+        service.get_page_by_cursor('people', 'not-a-cursor')
+
+
+@pytest.mark.parametrize("query", [
+    [5, None, None, None, "exact", []],
+    [["people"], None, None, None, "exact", []],
+    ["people", None, None, None, ["exact"], []],
+    ["people", None, None, None, "exact", [[["gender"], ["male"]]]],
+    ["people", None, None, None, "exact", [["gender", "male"]]],
+    ["people", None, None, None, "exact", {"gender": ["male"]}],
+    ["people", None, None, None, "exact", [["gender", [1]]]],
+])
+def test_crafted_cursors_are_rejected(service, query):
+    from cursor import encode_cursor
+    from errors import QueryValidationError
+
+    cursor = encode_cursor({'v': service.get_snapshot().digest, 'q': query, 'p': 0, 'n': 1})
+
+    with pytest.raises(QueryValidationError):
+        service.get_page_by_cursor('people', cursor)
+
+
+def test_fuzzy_match_mode(service):
+    response = service.get_people(name_filter="Skywaker", match='fuzzy')
+
+    assert [item['name'] for item in response['data']] == ["Luke Skywalker"]
+    assert service.get_people(name_filter="Skywaker")['meta']['total_items'] == 0
+
+
+def test_fuzzy_match_tolerates_typos_in_short_names(service):
+    response = service.get_people(name_filter="Solp", match='fuzzy')
+
+    assert [item['name'] for item in response['data']] == ["Han Solo"]
+
+
+def test_fuzzy_cursor_keeps_match_mode(service):
+    first = service.get_people(name_filter="a", match='fuzzy', size=3)
+    second = service.get_page_by_cursor('people', first['meta']['next_cursor'])
+
+    assert first['meta']['total_items'] == second['meta']['total_items'] == 4
+    assert len(second['data']) == 1
+    assert second['meta']['next_cursor'] is None
+
+
+def test_unknown_match_mode(service):
+    from errors import QueryValidationError
+
+    with pytest.raises(QueryValidationError):
+        service.get_people(name_filter="luke", match='regex')
+
+
+def test_field_filters(service):
+    response = service.get_species(field_filters={"classification": ["mammal"]}, sort_by="name")
+
+    assert [item['name'] for item in response['data']] == ["Human", "Wookiee"]
+
+
+def test_field_filters_combine_with_name_filter_and_cursor(service):
+    first = service.get_planets(name_filter="o", field_filters={"climate": ["arid,frozen"]}, size=1)
+    second = service.get_page_by_cursor('planets', first['meta']['next_cursor'])
+
+    assert first['data'][0]['name'] == "Tatooine"
+    assert second['data'][0]['name'] == "Hoth"
+    assert second['meta']['next_cursor'] is None
+
+
+def test_export_honours_fuzzy_match(service):
+    rows = list(service.export_resource('people', "Skywaker", fields=["name"], match='fuzzy'))
+
+    assert rows == ['{"name": "Luke Skywalker"}\n']
+
+
+def test_export_applies_field_filters(service):
+    rows = list(service.export_resource('species', fields=["name"], field_filters={"classification": ["mammal"]}))
+
+    assert rows == ['{"name": "Human"}\n', '{"name": "Wookiee"}\n']
+
+
+def test_unsorted_export_streams_without_caching(service):
+    class Unreachable(dict):
+        def get(self, *args):
+            raise AssertionError("export read past the first row")
+
+    snapshot = service.get_snapshot()
+    snapshot.data['people'] = [snapshot.data['people'][0], Unreachable()]
+
+    rows = service.export_resource('people', filter_term="l", fields=["name"])
+
+    assert next(rows) == '{"name": "Leia Organa"}\n'
+    assert len(snapshot.orderings) == 0
+
+
+def test_field_filters_reject_foreign_fields(service):
+    from errors import QueryValidationError
+
+    with pytest.raises(QueryValidationError):
+        service.get_planets(field_filters={"gender": ["male"]})
+
+
+def test_needs_load_only_when_a_request_would_crawl(mock_client):
+    service = StarWarsService(client=mock_client, snapshot_ttl=60)
+    assert service.needs_load()
+
+    service.get_people()
+    assert not service.needs_load()
+
+    service.snapshot_ttl = -1
+    assert service.needs_load()
+
+    with service._snapshot_lock:
+        assert not service.needs_load()
+
+
+def test_responses_are_cached_per_snapshot(service, mock_client):
+    first = service.get_people(sort_by="name", base_url="http://localhost")
+
+    assert service.get_people(sort_by="name", base_url="http://localhost") is first
+    assert service.get_people(sort_by="name", base_url="http://other") is not first
+
+    service.refresh_snapshot()
+
+    assert service.get_people(sort_by="name", base_url="http://localhost") is not first
+
+
+def test_warmup_prerenders_default_hot_queries(service):
+    result = service.warmup(base_url="http://localhost")
+    snapshot = service.get_snapshot()
+
+    assert result['failed'] == []
+    assert result['snapshot_version'] == snapshot.version
+    assert result['warmed'] == len(snapshot.warmed) == 6 + 17
+
+    cached = service.get_planets(base_url="http://localhost")
+    assert cached['meta']['total_items'] == 3
+    assert service.get_resource_by_id('people', 4, 'http://localhost')['name'] == "Darth Vader"
+    assert len(snapshot.warmed) == 23
+    assert len(snapshot.responses) == 0
+
+
+def test_warmup_custom_hot_queries(mock_client):
+    service = StarWarsService(client=mock_client, warmup_queries=["planets?page=1&size=2&sort=name", "films/1"])
+
+    result = service.warmup()
+
+    assert result['warmed'] == 2
+    assert len(service.get_snapshot().warmed) == 2
+    service.get_planets(sort_by="name", size=2)
+    assert len(service.get_snapshot().warmed) == 2
+    assert len(service.get_snapshot().responses) == 0
+
+
+def test_response_cache_is_lru_and_keeps_warmed_responses(mocker, mock_client):
+    mocker.patch('starwars_service.RESPONSE_CACHE_SIZE', 2)
+    service = StarWarsService(client=mock_client, warmup_queries=["films"])
+    service.warmup()
+
+    first = service.get_people(page=1, size=1)
+    service.get_people(page=2, size=1)
+    assert service.get_people(page=1, size=1) is first
+    service.get_people(page=3, size=1)
+
+    snapshot = service.get_snapshot()
+    assert [key[2] for key in snapshot.responses] == [1, 3]
+    assert [key[1].resource_type for key in snapshot.warmed] == ["films"]
+
+
+def test_missing_resources_are_not_cached(service):
+    assert service.get_resource_by_id('people', 99, 'http://localhost') is None
+    assert len(service.get_snapshot().responses) == 0
+
+
+def test_warmup_reports_failed_queries(service):
+    result = service.warmup(hot_queries=["people", "wookies", "people/abc"])
+
+    assert result['warmed'] == 1
+    assert [failure['query'] for failure in result['failed']] == ["wookies", "people/abc"]
+
+
+def test_refresh_schedules_warmup(mock_client, mocker):
+    thread = mocker.patch('starwars_service.threading.Thread')
+    service = StarWarsService(client=mock_client, warmup_base_url="http://localhost")
+
+    service.refresh_snapshot()
+
+    thread.assert_called_once_with(target=service.warmup, args=("http://localhost",), daemon=True)
+    thread.return_value.start.assert_called_once()